@@ -10,9 +10,17 @@ import sys
 import os
 import json
 import asyncio
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+import functools
+import bisect
+import importlib.util
+import math
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
 import hashlib
+import shutil
 from pathlib import Path
 from config import settings
 import re
@@ -27,6 +35,12 @@ except ImportError:
     OLLAMA_AVAILABLE = False
     print("⚠️  Ollama non disponible")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 try:
     from fastmcp import FastMCP
     FASTMCP_AVAILABLE = True
@@ -34,6 +48,11 @@ except ImportError:
     FASTMCP_AVAILABLE = False
     print("⚠️  FastMCP non disponible")
 
+try:
+    from fastmcp import Context
+except ImportError:
+    Context = None
+
 try:
     from .prompts import PromptManager, HoroscopePromptTemplates, WeeklyPromptTemplates, TitlePromptTemplates
     PROMPTS_AVAILABLE = True
@@ -51,10 +70,16 @@ except ImportError as e:
     print(f"⚠️ WeeklyGenerator non disponible: {e}")
 
 try:
-    astrochart_path = os.path.join(os.path.dirname(__file__), 'astrochart')
-    if astrochart_path not in sys.path:
-        sys.path.insert(0, astrochart_path)
-    from astrochart_mcp import astro_calculator  
+    try:
+        # Même module que main.py et les scripts : une seule éphéméride chargée par processus
+        from .astrochart.astrochart_mcp import get_calculator
+    except ImportError:
+        # Lancement direct du fichier (hors package)
+        astrochart_path = os.path.join(os.path.dirname(__file__), 'astrochart')
+        if astrochart_path not in sys.path:
+            sys.path.insert(0, astrochart_path)
+        from astrochart_mcp import get_calculator
+    astro_calculator = get_calculator()
     ASTROCHART_AVAILABLE = True
     print("✅ AstroChart Calculator importé")
 except ImportError:
@@ -62,6 +87,15 @@ except ImportError:
     astro_calculator = None
     print("⚠️ AstroChart non disponible")
 
+try:
+    from .astrochart.chart_renderer import render_chart, submit_chart_render, shutdown_chart_pool
+except ImportError:
+    # Lancement direct du fichier (hors package)
+    astrochart_path = os.path.join(os.path.dirname(__file__), 'astrochart')
+    if astrochart_path not in sys.path:
+        sys.path.insert(0, astrochart_path)
+    from chart_renderer import render_chart, submit_chart_render, shutdown_chart_pool
+
 try:
     from gtts import gTTS
     from mutagen.mp3 import MP3
@@ -70,12 +104,9 @@ except ImportError:
     TTS_AVAILABLE = False
     print("⚠️  TTS non disponible (gTTS, mutagen)")
 
-try:
-    import matplotlib.pyplot as plt
-    import numpy as np
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
+# Matplotlib n'est importé qu'au premier rendu d'image : les calculs purs n'en paient pas le coût
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec("matplotlib") is not None
+if not MATPLOTLIB_AVAILABLE:
     print("⚠️  Matplotlib non disponible pour les cartes astrales")
 
 # Configuration du logging
@@ -89,30 +120,175 @@ logger = logging.getLogger(__name__)
 # CONFIGURATION CENTRALISÉE
 # =============================================================================
 
-@dataclass
+# Scores par phase lunaire (noms identiques à _LUNAR_PHASES)
+LUNAR_PHASE_SCORES = {
+    "Nouvel Lune": 0.2,         # Nouvelle lune - faible influence
+    "Lune croissante": 0.6,     # Lune croissante - influence modérée
+    "Pleine Lune": 1.0,         # Pleine lune - influence maximale
+    "Lune décroissante": 0.4    # Lune décroissante - influence modérée-faible
+}
+
+# Multiplicateurs par élément (certains éléments plus sensibles à la lune)
+ELEMENT_LUNAR_MULTIPLIERS = {
+    "Eau": 1.2, 
+    "Air": 0.9,
+    "Feu": 0.8,
+    "Terre": 0.7
+}
+
+# Table précalculée (phase, élément) -> score de base * multiplicateur
+LUNAR_INFLUENCE_TABLE = {
+    (phase, element): phase_score * element_mult
+    for phase, phase_score in LUNAR_PHASE_SCORES.items()
+    for element, element_mult in ELEMENT_LUNAR_MULTIPLIERS.items()
+}
+
+# Débits MP3 Layer III (kbps) indexés par le champ bitrate de l'en-tête de trame
+_MP3_BITRATES_MPEG1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_MP3_BITRATES_MPEG2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+
+def _mp3_duration_from_header(path: str) -> Optional[float]:
+    """Durée d'un MP3 CBR (sortie gTTS) déduite du débit de la première trame et de la taille du fichier"""
+    with open(path, 'rb') as f:
+        head = f.read(4096)
+    file_size = os.path.getsize(path)
+
+    # Sauter un éventuel tag ID3v2 (taille encodée en entiers syncsafe)
+    offset = 0
+    if head[:3] == b'ID3' and len(head) >= 10:
+        offset = 10 + ((head[6] & 0x7F) << 21 | (head[7] & 0x7F) << 14 | (head[8] & 0x7F) << 7 | (head[9] & 0x7F))
+        if head[5] & 0x10:
+            offset += 10
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            head = f.read(4096)
+
+    for i in range(len(head) - 3):
+        if head[i] != 0xFF or (head[i + 1] & 0xE0) != 0xE0:
+            continue
+        version_bits = (head[i + 1] >> 3) & 0x03
+        layer_bits = (head[i + 1] >> 1) & 0x03
+        bitrate_index = head[i + 2] >> 4
+        if version_bits == 0x01 or layer_bits != 0x01 or bitrate_index in (0, 15):
+            continue
+        table = _MP3_BITRATES_MPEG1 if version_bits == 0x03 else _MP3_BITRATES_MPEG2
+        audio_bytes = file_size - offset - i
+        return audio_bytes * 8 / (table[bitrate_index] * 1000)
+    return None
+
+def _dataclass_default(obj):
+    """Sérialise un dataclass champ par champ, sans la copie profonde d'asdict()"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    raise TypeError(f"Type non sérialisable en JSON: {type(obj).__name__}")
+
+def _to_jsonable(value):
+    """Convertit récursivement les objets exposant to_dict() (données AstroChart) en dicts et listes"""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: _to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(item) for item in value]
+    return value
+
+def _is_retryable_ollama_error(error: Exception) -> bool:
+    """Seules les erreurs transitoires (réseau, 5xx, 429) méritent un nouvel essai"""
+    if OLLAMA_AVAILABLE and isinstance(error, ollama.ResponseError):
+        status_code = getattr(error, 'status_code', -1)
+        return status_code < 0 or status_code == 429 or status_code >= 500
+    return not isinstance(error, (ValueError, TypeError, KeyError))
+
+def _retry_delay(attempt: int) -> float:
+    """Backoff exponentiel plafonné à 8s, avec jitter pour désynchroniser les requêtes parallèles"""
+    return min(8, 2 ** attempt) + random.uniform(0, 0.3)
+
+def _count_words(text: str) -> int:
+    """Compte les mots sans construire la liste de split() quand le texte est déjà normalisé"""
+    if not text:
+        return 0
+    if text[0] != ' ' and text[-1] != ' ' and '  ' not in text and '\n' not in text and '\t' not in text:
+        return text.count(' ') + 1
+    return len(text.split())
+
+@functools.lru_cache(maxsize=64)
+def _normalize_sign(sign: str) -> str:
+    """Normalise un nom de signe fourni par un client (casse, espaces)"""
+    return sys.intern(sign.lower().strip())
+
+class _PartialFormatDict(dict):
+    """Laisse intacts les champs non fournis lors d'un format partiel"""
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+# Nouvelle lune de référence et bornes (en jours de cycle) de chaque phase
+_LUNAR_REFERENCE_ORDINAL = datetime.date(2024, 1, 11).toordinal()
+_LUNAR_CYCLE_DAYS = 29.5
+_LUNAR_PHASE_BOUNDS = (7.4, 14.8, 22.1)
+_LUNAR_PHASES = ("Nouvel Lune", "Lune croissante", "Pleine Lune", "Lune décroissante")
+
+@functools.lru_cache(maxsize=366)
+def _lunar_phase_for_ordinal(ordinal: int) -> tuple[str, int]:
+    """Phase lunaire simplifiée d'un jour (mise en cache, identique pour les 12 signes)"""
+    cycle_day = (ordinal - _LUNAR_REFERENCE_ORDINAL) % _LUNAR_CYCLE_DAYS
+    return _LUNAR_PHASES[bisect.bisect_right(_LUNAR_PHASE_BOUNDS, cycle_day)], int(cycle_day)
+
+@functools.lru_cache(maxsize=12)
+def _season_for_month(month: int) -> str:
+    if month in [12, 1, 2]: return "hiver"
+    if month in [3, 4, 5]: return "printemps"
+    if month in [6, 7, 8]: return "été"
+    return "automne"
+
+@dataclass(slots=True, frozen=True)
 class AstralContext:
     date: str
     day_of_week: str
     lunar_phase: str
     season: str
-    influential_planets: List[Dict[str, str]]
+    influential_planets: Tuple[Dict[str, str], ...]
     lunar_cycle_day: int
     seasonal_energy: str
 
-@dataclass
+    def to_dict(self) -> Dict:
+        return {
+            'date': self.date,
+            'day_of_week': self.day_of_week,
+            'lunar_phase': self.lunar_phase,
+            'season': self.season,
+            'influential_planets': [dict(planet) for planet in self.influential_planets],
+            'lunar_cycle_day': self.lunar_cycle_day,
+            'seasonal_energy': self.seasonal_energy
+        }
+
+@dataclass(slots=True, frozen=True)
 class SignMetadata:
     name: str
     dates: str
     element: str
     ruling_planet: str
     constellation: str
-    traits: List[str]
-    colors: List[str]
+    traits: Tuple[str, ...]
+    colors: Tuple[str, ...]
     stone: str
-    keywords: List[str]
-    compatible_signs: List[str]
+    keywords: Tuple[str, ...]
+    compatible_signs: Tuple[str, ...]
 
-@dataclass
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'dates': self.dates,
+            'element': self.element,
+            'ruling_planet': self.ruling_planet,
+            'constellation': self.constellation,
+            'traits': list(self.traits),
+            'colors': list(self.colors),
+            'stone': self.stone,
+            'keywords': list(self.keywords),
+            'compatible_signs': list(self.compatible_signs)
+        }
+
+@dataclass(slots=True, frozen=True)
 class HoroscopeResult:
     sign: str
     date: str
@@ -124,6 +300,50 @@ class HoroscopeResult:
     word_count: int
     astrochart_data: Optional[Dict] = None  
     title_theme: Optional[str] = None 
+
+    def to_dict(self) -> Dict:
+        """Dict sérialisable en JSON, sans la copie profonde générique d'asdict()"""
+        return {
+            'sign': self.sign,
+            'date': self.date,
+            'horoscope_text': self.horoscope_text,
+            'astral_context': self.astral_context.to_dict(),
+            'metadata': self.metadata.to_dict(),
+            'lunar_influence_score': self.lunar_influence_score,
+            'generation_timestamp': self.generation_timestamp,
+            'word_count': self.word_count,
+            'astrochart_data': _to_jsonable(self.astrochart_data),
+            'title_theme': self.title_theme
+        }
+
+# Données fixes des signes, partagées par toutes les instances d'AstroGenerator
+_SIGNS_RAW = {
+    "aries": {"name": "Bélier", "dates": "21 mars - 19 avril", "element": "Feu", "ruling_planet": "Mars", "constellation": "Aries", "traits": ("énergique", "impulsif", "leader", "courageux", "direct"), "colors": ("rouge", "orange vif"), "stone": "Diamant", "keywords": ("action", "initiative", "énergie", "nouveauté"), "compatible_signs": ("Lion", "Sagittaire", "Gémeaux")},
+    "taurus": {"name": "Taureau", "dates": "20 avril - 20 mai", "element": "Terre", "ruling_planet": "Vénus", "constellation": "Taurus", "traits": ("stable", "sensuel", "têtu", "pratique", "loyal"), "colors": ("vert", "rose"), "stone": "Émeraude", "keywords": ("stabilité", "plaisir", "patience", "beauté"), "compatible_signs": ("Vierge", "Capricorne", "Cancer")},
+    "gemini": {"name": "Gémeaux", "dates": "21 mai - 20 juin", "element": "Air", "ruling_planet": "Mercure", "constellation": "Gemini", "traits": ("communicatif", "curieux", "adaptable", "versatile", "sociable"), "colors": ("jaune", "argent"), "stone": "Agate", "keywords": ("communication", "curiosité", "adaptabilité", "échange"), "compatible_signs": ("Balance", "Verseau", "Bélier")},
+    "cancer": {"name": "Cancer", "dates": "21 juin - 22 juillet", "element": "Eau", "ruling_planet": "Lune", "constellation": "Cancer", "traits": ("émotionnel", "protecteur", "intuitif", "familial", "sensible"), "colors": ("blanc", "argenté"), "stone": "Pierre de lune", "keywords": ("émotion", "famille", "intuition", "protection"), "compatible_signs": ("Scorpion", "Poissons", "Taureau")},
+    "leo": {"name": "Lion", "dates": "23 juillet - 22 août", "element": "Feu", "ruling_planet": "Soleil", "constellation": "Leo", "traits": ("généreux", "fier", "créatif", "charismatique", "théâtral"), "colors": ("or", "orange"), "stone": "Rubis", "keywords": ("créativité", "leadership", "générosité", "spectacle"), "compatible_signs": ("Bélier", "Sagittaire", "Gémeaux")},
+    "virgo": {"name": "Vierge", "dates": "23 août - 22 septembre", "element": "Terre", "ruling_planet": "Mercure", "constellation": "Virgo", "traits": ("perfectionniste", "analytique", "serviable", "modeste", "pratique"), "colors": ("bleu marine", "gris"), "stone": "Saphir", "keywords": ("précision", "service", "analyse", "amélioration"), "compatible_signs": ("Taureau", "Capricorne", "Cancer")},
+    "libra": {"name": "Balance", "dates": "23 septembre - 22 octobre", "element": "Air", "ruling_planet": "Vénus", "constellation": "Libra", "traits": ("équilibré", "diplomatique", "esthète", "indécis", "charmant"), "colors": ("bleu pastel", "rose"), "stone": "Opale", "keywords": ("harmonie", "beauté", "justice", "partenariat"), "compatible_signs": ("Gémeaux", "Verseau", "Lion")},
+    "scorpio": {"name": "Scorpion", "dates": "23 octobre - 21 novembre", "element": "Eau", "ruling_planet": "Pluton", "constellation": "Scorpius", "traits": ("intense", "mystérieux", "passionné", "déterminé", "magnétique"), "colors": ("rouge sombre", "noir"), "stone": "Topaze", "keywords": ("transformation", "passion", "mystère", "pouvoir"), "compatible_signs": ("Cancer", "Poissons", "Vierge")},
+    "sagittarius": {"name": "Sagittaire", "dates": "22 novembre - 21 décembre", "element": "Feu", "ruling_planet": "Jupiter", "constellation": "Sagittarius", "traits": ("aventurier", "optimiste", "philosophe", "libre", "direct"), "colors": ("violet", "turquoise"), "stone": "Turquoise", "keywords": ("aventure", "sagesse", "liberté", "expansion"), "compatible_signs": ("Bélier", "Lion", "Balance")},
+    "capricorn": {"name": "Capricorne", "dates": "22 décembre - 19 janvier", "element": "Terre", "ruling_planet": "Saturne", "constellation": "Capricornus", "traits": ("ambitieux", "discipliné", "responsable", "patient", "traditionaliste"), "colors": ("marron", "noir"), "stone": "Grenat", "keywords": ("ambition", "structure", "persévérance", "réussite"), "compatible_signs": ("Taureau", "Vierge", "Scorpion")},
+    "aquarius": {"name": "Verseau", "dates": "20 janvier - 18 février", "element": "Air", "ruling_planet": "Uranus", "constellation": "Aquarius", "traits": ("original", "indépendant", "humanitaire", "rebelle", "visionnaire"), "colors": ("bleu électrique", "argent"), "stone": "Améthyste", "keywords": ("innovation", "humanité", "indépendance", "futur"), "compatible_signs": ("Gémeaux", "Balance", "Sagittaire")},
+    "pisces": {"name": "Poissons", "dates": "19 février - 20 mars", "element": "Eau", "ruling_planet": "Neptune", "constellation": "Pisces", "traits": ("intuitif", "artistique", "empathique", "rêveur", "spirituel"), "colors": ("bleu mer", "violet"), "stone": "Aigue-marine", "keywords": ("intuition", "art", "spiritualité", "compassion"), "compatible_signs": ("Cancer", "Scorpion", "Capricorne")},
+}
+
+_SIGNS_DATA: Dict[str, SignMetadata] = {key: SignMetadata(**data) for key, data in _SIGNS_RAW.items()}
+
+_PLANETARY_INFLUENCES = {
+    "mercury": {"domains": ("communication", "voyage", "intellect", "commerce"), "direct": "clarté mentale et communication fluide", "retrograde": "malentendus possibles, patience requise"},
+    "venus": {"domains": ("amour", "beauté", "argent", "art"), "direct": "harmonie en amour et créativité épanouie", "retrograde": "remise en question des relations"},
+    "mars": {"domains": ("énergie", "action", "conflit", "passion"), "direct": "énergie débordante et initiatives couronnées de succès", "retrograde": "frustrations possibles, agir avec prudence"},
+    "jupiter": {"domains": ("chance", "expansion", "sagesse", "voyage"), "direct": "opportunités et croissance positive", "retrograde": "réflexion intérieure et réévaluation des objectifs"},
+    "saturn": {"domains": ("discipline", "responsabilité", "limites", "karma"), "direct": "structure et récompenses du travail accompli", "retrograde": "leçons importantes et restructuration nécessaire"}
+}
+
+_SEASONAL_ENERGIES = {"hiver": "introspection et renouveau", "printemps": "croissance et nouveaux départs", "été": "expansion et réalisation", "automne": "récolte et transformation"}
+
 # =============================================================================
 # CLASS ASTROCHART IMAGE GENERATOR
 # =============================================================================
@@ -135,18 +355,13 @@ class AstroChartImageGenerator:
         self.images_dir = settings.STATIC_CHARTS_DIR
         self.images_dir.mkdir(exist_ok=True, parents=True)
         
-        self.chart_image_size = (6, 6) 
-        self.chart_background_color = "#0c0e1c" 
-        self.chart_text_color = "#e6e6fa" 
         self.chart_image_format = "png"
-        self.chart_image_dpi = 200
         
         # Dictionnaires de correspondances
         self.planet_symbols = {
             'sun': '☉', 'moon': '☽', 'mercury': '☿', 'venus': '♀', 'mars': '♂', 
             'jupiter': '♃', 'saturn': '♄', 'uranus': '♅', 'neptune': '♆', 'pluto': '♇'
         }
-        self.zodiac_symbols = ['♈', '♉', '♊', '♋', '♌', '♍', '♎', '♏', '♐', '♑', '♒', '♓']
         self.planet_colors = {
             'sun': '#FFD700', 'moon': '#C0C0C0', 'mercury': '#FFA500', 
             'venus': '#FF69B4', 'mars': '#FF4500', 'jupiter': '#4169E1', 
@@ -159,6 +374,26 @@ class AstroChartImageGenerator:
             'uranus': 'uranus', 'neptune': 'neptune', 'pluton': 'pluto'
         }
 
+    def create_chart_data(self, positions) -> List[Dict]:
+        """Prépare les données de tracé des planètes, sans matplotlib"""
+        chart_data = []
+        for planet_data in positions:
+            # Utiliser le dictionnaire de mapping pour trouver la bonne clé
+            planet_key = self.name_to_key_map.get(planet_data.name.lower(), "unknown")
+            chart_data.append({
+                'name': planet_data.name,
+                'symbol': self.planet_symbols.get(planet_key, '?'),
+                'color': self.planet_colors.get(planet_key, 'white'),
+                'angle': math.radians(planet_data.longitude),
+                'sign_name': planet_data.sign_name,
+                'degree_in_sign': planet_data.degree_in_sign
+            })
+        return chart_data
+
+    def _default_chart_path(self, date: datetime.date) -> Path:
+        filename = f"astro_chart_{date.strftime('%Y%m%d')}.{self.chart_image_format}"
+        return self.images_dir / filename
+
     def create_chart_from_positions(self, positions, date: datetime.date, 
                                   output_path: Optional[str] = None) -> Optional[str]:
         """Crée une carte à partir des positions calculées par AstroCalculator"""
@@ -170,71 +405,42 @@ class AstroChartImageGenerator:
                 logger.error("Aucune position planétaire fournie")
                 return None
             
-            fig, ax = plt.subplots(figsize=self.chart_image_size, subplot_kw=dict(projection='polar'))
-            ax.set_facecolor(self.chart_background_color)
-            fig.patch.set_facecolor(self.chart_background_color)
-            
-            for i in range(12):
-                angle = np.radians(i * 30)
-                ax.plot([angle, angle], [0.6, 1.1], color=self.chart_text_color, alpha=0.5, linewidth=1)
-                sign_angle = np.radians(i * 30 + 15)
-                ax.text(sign_angle, 1.05, self.zodiac_symbols[i], ha='center', va='center', fontsize=20, color=self.chart_text_color, weight='bold')
-            
-            for planet_data in positions:
-                # Utiliser le dictionnaire de mapping pour trouver la bonne clé
-                planet_key = self.name_to_key_map.get(planet_data.name.lower(), "unknown")
-                
-                longitude = planet_data.longitude
-                degree_in_sign = planet_data.degree_in_sign
-                angle = np.radians(longitude)
-                color = self.planet_colors.get(planet_key, 'white')
-                symbol = self.planet_symbols.get(planet_key, '?')
-                
-                ax.scatter(angle, 0.85, s=300, c=color, edgecolors='white', linewidth=2, zorder=10)
-                ax.text(angle, 0.85, symbol, ha='center', va='center', fontsize=16, color='black', weight='bold', zorder=11)
-                ax.text(angle, 0.75, f"{degree_in_sign:.0f}°", ha='center', va='center', fontsize=8, color='white')
-            
-            ax.set_theta_zero_location('N')  
-            ax.set_theta_direction(1)        
-            
-            ax.set_ylim(0, 1.2)
-            ax.set_rticks([])
-            ax.set_thetagrids([])
-            ax.grid(False)
+            chart_path = render_chart(
+                self.create_chart_data(positions), date, output_path or self._default_chart_path(date)
+            )
             
-            ax.set_title(f"skyfield(de440s) - {date.strftime('%d/%m/%Y')}", fontsize=8, color=self.chart_text_color, pad=30, weight='bold')
-            legend_text = []
-            for planet_data in positions:
-                planet_key = self.name_to_key_map.get(planet_data.name.lower(), "unknown")
-                symbol = self.planet_symbols.get(planet_key, '?')
-                sign = planet_data.sign_name
-                degree = planet_data.degree_in_sign
-                legend_text.append(f"{symbol} {planet_data.name.title()}: {sign} {degree:.1f}°")
+            logger.info(f"✅ Carte astrologique sauvegardée: {chart_path}")
+            return chart_path
             
-            fig.text(0.98, 0.98, '\n'.join(legend_text), 
-                    fontsize=6, 
-                    color='white', 
-                    ha='right',  
-                    va='top',    
-                    fontfamily='monospace',
-                    bbox=dict(boxstyle="round,pad=0.4", facecolor='black', alpha=0.8))
-            if not output_path:
-                filename = f"astro_chart_{date.strftime('%Y%m%d')}.{self.chart_image_format}"
-                output_path = self.images_dir / filename
+        except Exception as e:
+            logger.error(f"Erreur création carte astrologique: {e}")
+            return None
+
+    async def render_chart_async(self, positions, date: datetime.date,
+                                 output_path: Optional[str] = None) -> Optional[str]:
+        """Comme create_chart_from_positions, mais rendu dans un processus dédié sans bloquer la boucle"""
+        try:
+            if not MATPLOTLIB_AVAILABLE:
+                logger.error("Matplotlib non disponible pour génération d'images")
+                return None
+            if not positions:
+                logger.error("Aucune position planétaire fournie")
+                return None
             
-            plt.savefig(output_path, facecolor=self.chart_background_color, dpi=self.chart_image_dpi, bbox_inches='tight')
-            plt.close(fig)
+            # Seules des données simples (dicts, date, chemin) traversent la frontière de processus
+            chart_data = self.create_chart_data(positions)
+            chart_path = await asyncio.wrap_future(
+                submit_chart_render(chart_data, date, str(output_path or self._default_chart_path(date)))
+            )
             
-            logger.info(f"✅ Carte astrologique sauvegardée: {output_path}")
-            return str(output_path)
+            logger.info(f"✅ Carte astrologique sauvegardée: {chart_path}")
+            return chart_path
             
         except Exception as e:
             logger.error(f"Erreur création carte astrologique: {e}")
-            if 'fig' in locals():
-                plt.close(fig)
             return None
 
- 
+
 # =============================================================================
 # CLASS ASTRO GENERATOR
 # =============================================================================
@@ -246,11 +452,33 @@ class AstroGenerator:
         self.ollama_model = settings.OLLAMA_TEXT_MODEL
         self.audio_output_dir = settings.GENERATED_AUDIO_DIR
         self.max_retries = 3 
+        self.ollama_parallel = settings.OLLAMA_NUM_PARALLEL
+        self._ollama_semaphore: Optional[asyncio.Semaphore] = None
+        self._ollama_client = None
+        self._ollama_loop = None
+        self._closing_tasks: set = set()
+        self.batch_window = settings.OLLAMA_BATCH_WINDOW_MS / 1000
+        # Horoscopes en attente de regroupement : (date, carte) -> {signe: future}
+        self._pending_batches: Dict[tuple, Dict[str, asyncio.Future]] = {}
+        self._batch_tasks: set = set()
         self.horoscope_min_words = 100
         self.horoscope_max_words = 200
         self.signs_data = self._load_signs_data()
+        self._canonical_signs = frozenset(sys.intern(key) for key in self.signs_data)
+        self._sign_name_to_key = {data.name: key for key, data in self.signs_data.items()}
+        sign_names = '|'.join(re.escape(name) for name in self._sign_name_to_key)
+        self._daily_batch_pattern = re.compile(
+            rf"\*\*\s*({sign_names})\s*:?\s*\*\*\s*:?\s*(.*?)(?=\*\*\s*(?:{sign_names})\s*:?\s*\*\*|\Z)",
+            re.DOTALL
+        )
         self.planetary_influences = self._load_planetary_influences()
+        self._planet_table = self._build_planet_table()
         self.audio_lang = "fr"
+        self._audio_files_cache: Optional[Tuple[int, int]] = None  # (mtime_ns du dossier, nombre de mp3)
+        self._tts_hash_cache: Dict[str, Tuple[str, float]] = {}  # hash du texte -> (chemin, durée)
+        self._tts_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="tts")
+        self.horoscope_cache_size = 128
+        self._horoscope_cache: "OrderedDict[Tuple[str, int, bool], Tuple[HoroscopeResult, Optional[str], float]]" = OrderedDict()
         
         os.makedirs(self.audio_output_dir, exist_ok=True)
         if MATPLOTLIB_AVAILABLE:
@@ -278,63 +506,47 @@ class AstroGenerator:
             self.weekly_prompts = None
             self.title_prompts = None
 
+        self._prompt_templates = self._build_prompt_templates()
 
     # =============================================================================
     # MÉTHODES UTILITAIRES 
     # =============================================================================
 
     def _load_signs_data(self) -> Dict[str, SignMetadata]:
-        signs_raw = {
-            "aries": {"name": "Bélier", "dates": "21 mars - 19 avril", "element": "Feu", "ruling_planet": "Mars", "constellation": "Aries", "traits": ["énergique", "impulsif", "leader", "courageux", "direct"], "colors": ["rouge", "orange vif"], "stone": "Diamant", "keywords": ["action", "initiative", "énergie", "nouveauté"], "compatible_signs": ["Lion", "Sagittaire", "Gémeaux"]},
-            "taurus": {"name": "Taureau", "dates": "20 avril - 20 mai", "element": "Terre", "ruling_planet": "Vénus", "constellation": "Taurus", "traits": ["stable", "sensuel", "têtu", "pratique", "loyal"], "colors": ["vert", "rose"], "stone": "Émeraude", "keywords": ["stabilité", "plaisir", "patience", "beauté"], "compatible_signs": ["Vierge", "Capricorne", "Cancer"]},
-            "gemini": {"name": "Gémeaux", "dates": "21 mai - 20 juin", "element": "Air", "ruling_planet": "Mercure", "constellation": "Gemini", "traits": ["communicatif", "curieux", "adaptable", "versatile", "sociable"], "colors": ["jaune", "argent"], "stone": "Agate", "keywords": ["communication", "curiosité", "adaptabilité", "échange"], "compatible_signs": ["Balance", "Verseau", "Bélier"]},
-            "cancer": {"name": "Cancer", "dates": "21 juin - 22 juillet", "element": "Eau", "ruling_planet": "Lune", "constellation": "Cancer", "traits": ["émotionnel", "protecteur", "intuitif", "familial", "sensible"], "colors": ["blanc", "argenté"], "stone": "Pierre de lune", "keywords": ["émotion", "famille", "intuition", "protection"], "compatible_signs": ["Scorpion", "Poissons", "Taureau"]},
-            "leo": {"name": "Lion", "dates": "23 juillet - 22 août", "element": "Feu", "ruling_planet": "Soleil", "constellation": "Leo", "traits": ["généreux", "fier", "créatif", "charismatique", "théâtral"], "colors": ["or", "orange"], "stone": "Rubis", "keywords": ["créativité", "leadership", "générosité", "spectacle"], "compatible_signs": ["Bélier", "Sagittaire", "Gémeaux"]},
-            "virgo": {"name": "Vierge", "dates": "23 août - 22 septembre", "element": "Terre", "ruling_planet": "Mercure", "constellation": "Virgo", "traits": ["perfectionniste", "analytique", "serviable", "modeste", "pratique"], "colors": ["bleu marine", "gris"], "stone": "Saphir", "keywords": ["précision", "service", "analyse", "amélioration"], "compatible_signs": ["Taureau", "Capricorne", "Cancer"]},
-            "libra": {"name": "Balance", "dates": "23 septembre - 22 octobre", "element": "Air", "ruling_planet": "Vénus", "constellation": "Libra", "traits": ["équilibré", "diplomatique", "esthète", "indécis", "charmant"], "colors": ["bleu pastel", "rose"], "stone": "Opale", "keywords": ["harmonie", "beauté", "justice", "partenariat"], "compatible_signs": ["Gémeaux", "Verseau", "Lion"]},
-            "scorpio": {"name": "Scorpion", "dates": "23 octobre - 21 novembre", "element": "Eau", "ruling_planet": "Pluton", "constellation": "Scorpius", "traits": ["intense", "mystérieux", "passionné", "déterminé", "magnétique"], "colors": ["rouge sombre", "noir"], "stone": "Topaze", "keywords": ["transformation", "passion", "mystère", "pouvoir"], "compatible_signs": ["Cancer", "Poissons", "Vierge"]},
-            "sagittarius": {"name": "Sagittaire", "dates": "22 novembre - 21 décembre", "element": "Feu", "ruling_planet": "Jupiter", "constellation": "Sagittarius", "traits": ["aventurier", "optimiste", "philosophe", "libre", "direct"], "colors": ["violet", "turquoise"], "stone": "Turquoise", "keywords": ["aventure", "sagesse", "liberté", "expansion"], "compatible_signs": ["Bélier", "Lion", "Balance"]},
-            "capricorn": {"name": "Capricorne", "dates": "22 décembre - 19 janvier", "element": "Terre", "ruling_planet": "Saturne", "constellation": "Capricornus", "traits": ["ambitieux", "discipliné", "responsable", "patient", "traditionaliste"], "colors": ["marron", "noir"], "stone": "Grenat", "keywords": ["ambition", "structure", "persévérance", "réussite"], "compatible_signs": ["Taureau", "Vierge", "Scorpion"]},
-            "aquarius": {"name": "Verseau", "dates": "20 janvier - 18 février", "element": "Air", "ruling_planet": "Uranus", "constellation": "Aquarius", "traits": ["original", "indépendant", "humanitaire", "rebelle", "visionnaire"], "colors": ["bleu électrique", "argent"], "stone": "Améthyste", "keywords": ["innovation", "humanité", "indépendance", "futur"], "compatible_signs": ["Gémeaux", "Balance", "Sagittaire"]},
-            "pisces": {"name": "Poissons", "dates": "19 février - 20 mars", "element": "Eau", "ruling_planet": "Neptune", "constellation": "Pisces", "traits": ["intuitif", "artistique", "empathique", "rêveur", "spirituel"], "colors": ["bleu mer", "violet"], "stone": "Aigue-marine", "keywords": ["intuition", "art", "spiritualité", "compassion"], "compatible_signs": ["Cancer", "Scorpion", "Capricorne"]},
-        }
-        return {key: SignMetadata(**data) for key, data in signs_raw.items()}
+        return _SIGNS_DATA
 
     def _load_planetary_influences(self) -> Dict[str, Dict]:
-        return {
-            "mercury": {"domains": ["communication", "voyage", "intellect", "commerce"], "direct": "clarté mentale et communication fluide", "retrograde": "malentendus possibles, patience requise"},
-            "venus": {"domains": ["amour", "beauté", "argent", "art"], "direct": "harmonie en amour et créativité épanouie", "retrograde": "remise en question des relations"},
-            "mars": {"domains": ["énergie", "action", "conflit", "passion"], "direct": "énergie débordante et initiatives couronnées de succès", "retrograde": "frustrations possibles, agir avec prudence"},
-            "jupiter": {"domains": ["chance", "expansion", "sagesse", "voyage"], "direct": "opportunités et croissance positive", "retrograde": "réflexion intérieure et réévaluation des objectifs"},
-            "saturn": {"domains": ["discipline", "responsabilité", "limites", "karma"], "direct": "structure et récompenses du travail accompli", "retrograde": "leçons importantes et restructuration nécessaire"}
-        }
+        return _PLANETARY_INFLUENCES
 
     def _calculate_lunar_phase(self, date: datetime.date) -> tuple[str, int]:
-        reference, cycle_days = datetime.date(2024, 1, 11), 29.5
-        cycle_day = ((date - reference).days) % cycle_days
-        if cycle_day < 7.4: phase = "Nouvel Lune"
-        elif cycle_day < 14.8: phase = "Lune croissante"
-        elif cycle_day < 22.1: phase = "Pleine Lune"
-        else: phase = "Lune décroissante"
-        return phase, int(cycle_day)
+        return _lunar_phase_for_ordinal(date.toordinal())
     
     def _get_season(self, date: datetime.date) -> str:
-        month = date.month
-        if month in [12, 1, 2]: return "hiver"
-        if month in [3, 4, 5]: return "printemps"
-        if month in [6, 7, 8]: return "été"
-        return "automne"
+        return _season_for_month(date.month)
     
+    def _build_planet_table(self) -> List[List[Tuple[Dict[str, str], ...]]]:
+        """Précalcule les planètes influentes (2 max) pour chaque couple (mois, jour), indexé [mois][jour]"""
+        mercury = {"name": "Mercure", "state": "rétrograde", "influence": self.planetary_influences["mercury"]["retrograde"]}
+        jupiter = {"name": "Jupiter", "state": "direct", "influence": self.planetary_influences["jupiter"]["direct"]}
+        mars = {"name": "Mars", "state": "direct", "influence": self.planetary_influences["mars"]["direct"]}
+        venus = {"name": "Vénus", "state": "direct", "influence": self.planetary_influences["venus"]["direct"]}
+
+        table = [[()] * 32 for _ in range(13)]
+        for month in range(1, 13):
+            for day in range(1, 32):
+                planets = []
+                if month in [3, 7, 11]: planets.append(mercury)
+                if day % 7 == 0: planets.append(jupiter)
+                if day % 2 == 1: planets.append(mars)
+                if month in [6, 7, 8]: planets.append(venus)
+                table[month][day] = tuple(planets[:2])
+        return table
+
     def get_astral_context(self, date: datetime.date) -> AstralContext:
         lunar_phase, cycle_day = self._calculate_lunar_phase(date)
         season = self._get_season(date)
-        energies = {"hiver": "introspection et renouveau", "printemps": "croissance et nouveaux départs", "été": "expansion et réalisation", "automne": "récolte et transformation"}
-        planets = []
-        if date.month in [3, 7, 11]: planets.append({"name": "Mercure", "state": "rétrograde", "influence": self.planetary_influences["mercury"]["retrograde"]})
-        if date.day % 7 == 0: planets.append({"name": "Jupiter", "state": "direct", "influence": self.planetary_influences["jupiter"]["direct"]})
-        if date.day % 2 == 1: planets.append({"name": "Mars", "state": "direct", "influence": self.planetary_influences["mars"]["direct"]})
-        if date.month in [6, 7, 8]: planets.append({"name": "Vénus", "state": "direct", "influence": self.planetary_influences["venus"]["direct"]})
-        return AstralContext(date=date.strftime("%Y-%m-%d"), day_of_week=date.strftime("%A"), lunar_phase=lunar_phase, season=season, influential_planets=planets[:2], lunar_cycle_day=cycle_day, seasonal_energy=energies.get(season, "équilibre"))
+        planets = self._planet_table[date.month][date.day]
+        return AstralContext(date=date.strftime("%Y-%m-%d"), day_of_week=date.strftime("%A"), lunar_phase=lunar_phase, season=season, influential_planets=planets, lunar_cycle_day=cycle_day, seasonal_energy=_SEASONAL_ENERGIES.get(season, "équilibre"))
 
     def _format_astral_context_for_weekly(self, start_date: datetime.date, end_date: datetime.date) -> str:
         """
@@ -363,13 +575,17 @@ class AstroGenerator:
         return formatted
 
     def get_sign_metadata(self, sign: str) -> Optional[SignMetadata]:
-        return self.signs_data.get(sign.lower())
+        if sign in self._canonical_signs:
+            return self.signs_data[sign]
+        return self.signs_data.get(_normalize_sign(sign))
 
     def _validate_sign(self, sign: str) -> str:
         """Valide et normalise un signe astrologique."""
+        if sign in self._canonical_signs:
+            return sign
         if not sign:
             raise ValueError("Signe manquant")
-        sign_lower = sign.lower().strip()
+        sign_lower = _normalize_sign(sign)
         if sign_lower not in self.signs_data:
             available = ", ".join(self.signs_data.keys())
             raise ValueError(f"Signe invalide '{sign}'. Disponibles: {available}")
@@ -539,38 +755,21 @@ class AstroGenerator:
         return text.strip()
 
     
-    def calculate_lunar_influence(self, sign: str, date: datetime.date) -> float:
+    def calculate_lunar_influence(self, sign: str, date: datetime.date,
+                                  astral_context: Optional[AstralContext] = None) -> float:
         """Calcule l'influence lunaire sur un signe pour une date donnée."""
         try:
             # Validation des entrées
             validated_sign = self._validate_sign(sign)
             sign_data = self.get_sign_metadata(validated_sign)
-            astral_context = self.get_astral_context(date)
-            
-            # Scores par phase lunaire
-            phase_scores = {
-                "Nouvelle lune": 0.2,      # Nouvelle lune - faible influence
-                "Lune croissante ": 0.6,   # Lune croissante - influence modérée
-                "Pleine lune ": 1.0,     # Pleine lune - influence maximale
-                "Lune décroissante": 0.4    # Lune décroissante - influence modérée-faible
-            }
+            astral_context = astral_context or self.get_astral_context(date)
             
-            # Multiplicateurs par élément (certains éléments plus sensibles à la lune)
-            element_multipliers = {
-                "Eau": 1.2, 
-                "Air": 0.9,
-                "Feu": 0.8,
-                "Terre": 0.7
-            }
-            
-            # Score de base selon la phase
-            base_score = phase_scores.get(astral_context.lunar_phase, 0.5)
-            # Multiplicateur selon l'élément du signe
-            element_mult = element_multipliers.get(sign_data.element, 1.0)
+            # Score de base selon la phase, pondéré par l'élément du signe
+            base_score = LUNAR_INFLUENCE_TABLE.get((astral_context.lunar_phase, sign_data.element), 0.5)
             # Influence du jour dans le cycle lunaire (pic au milieu du cycle)
-            cycle_influence = 1.0 - abs(astral_context.lunar_cycle_day - 14.5) / 14.5
+            cycle_influence = 1.0 - abs(astral_context.lunar_cycle_day - 14.5) * (1 / 14.5)
             # Calcul final
-            final_score = base_score * element_mult * cycle_influence
+            final_score = base_score * cycle_influence
             return min(max(final_score, 0.0), 1.0)
             
         except Exception as e:
@@ -581,34 +780,133 @@ class AstroGenerator:
     # OLLAMA MODELS 
     # =============================================================================
 
-    async def _call_ollama_with_retry(self, prompt: str) -> str:
-        """Appelle Ollama avec retry automatique."""
+    def _bind_ollama_loop(self):
+        """(Re)crée sémaphore et client Ollama pour la boucle courante (Flask en crée une par requête)"""
+        loop = asyncio.get_running_loop()
+        if self._ollama_loop is not loop:
+            old_client = self._ollama_client
+            self._ollama_semaphore = asyncio.Semaphore(self.ollama_parallel)
+            self._ollama_client = ollama.AsyncClient(host=settings.OLLAMA_BASE_URL)
+            self._ollama_loop = loop
+            self._pending_batches = {}
+            if old_client is not None:
+                # Le client de la boucle précédente est fermé en tâche de fond : son pool ne fuit pas
+                task = loop.create_task(self._close_ollama_client(old_client))
+                self._closing_tasks.add(task)
+                task.add_done_callback(self._closing_tasks.discard)
+
+    @staticmethod
+    async def _close_ollama_client(client) -> None:
+        """Ferme le pool HTTP d'un client Ollama (close() si la version d'ollama le fournit)"""
+        try:
+            close = getattr(client, "close", None)
+            if close is None:
+                # Anciennes versions d'ollama : pas de close(), le client httpx sous-jacent est fermé directement
+                close = getattr(getattr(client, "_client", None), "aclose", None)
+            if close is not None:
+                await close()
+        except Exception as e:
+            logger.debug(f"Fermeture du client Ollama: {e}")
+
+    def _get_ollama_semaphore(self) -> asyncio.Semaphore:
+        """Limite les requêtes Ollama simultanées"""
+        self._bind_ollama_loop()
+        return self._ollama_semaphore
+
+    def _get_ollama_client(self) -> "ollama.AsyncClient":
+        """Client Ollama partagé : le pool de connexions HTTP est réutilisé entre les appels"""
+        self._bind_ollama_loop()
+        return self._ollama_client
+
+    async def aclose(self):
+        """Libère le pool de connexions Ollama et le pool TTS (à appeler à l'arrêt)"""
+        if self._ollama_client is not None:
+            await self._close_ollama_client(self._ollama_client)
+            self._ollama_client = None
+            self._ollama_loop = None
+        self._tts_executor.shutdown(wait=False)
+        shutdown_chart_pool()
+
+    @staticmethod
+    def _num_predict_for_words(max_words: int) -> int:
+        """Plafond de tokens large pour un texte de max_words mots (~1.3 token/mot en français).
+
+        Le budget vaut environ trois fois l'estimation : c'est la limite de mots du
+        streaming (max_words) qui coupe le texte, num_predict ne sert que de garde-fou.
+        """
+        return int(max_words * 1.3 * 3) + 64
+
+    @staticmethod
+    def _truncate_to_sentence(text: str) -> str:
+        """Coupe un texte interrompu après sa dernière phrase complète"""
+        end = max(text.rfind('.'), text.rfind('!'), text.rfind('?'))
+        return text[:end + 1] if end > 0 else text
+
+    async def _call_ollama_with_retry(self, prompt: str, num_predict: Optional[int] = None,
+                                      max_words: Optional[int] = None) -> str:
+        """Appelle Ollama avec retry automatique.
+
+        La réponse est lue en streaming : si max_words est fourni, la génération est
+        interrompue dès que ce nombre de mots est dépassé.
+        """
         if not OLLAMA_AVAILABLE:
             raise Exception("Ollama non disponible")
+        if num_predict is None:
+            num_predict = self._num_predict_for_words(self.horoscope_max_words)
         
         last_error = None
         for attempt in range(self.max_retries):
             try:
                 # Essayer avec la bibliothèque ollama
-                response = ollama.chat(
-                    model=self.ollama_model,
-                    stream=False,
-                    think=False,
-                    messages=[{'role': 'user', 'content': prompt}],
-                    options={
-                        'temperature': 0.7,
-                        'top_p': 0.9,
-                        'num_predict': 5000, 
-                        'stop': None  
-                    }
-                )
-                return response['message']['content']
+                async with self._get_ollama_semaphore():
+                    stream = await self._get_ollama_client().chat(
+                        model=self.ollama_model,
+                        stream=True,
+                        think=False,
+                        messages=[{'role': 'user', 'content': prompt}],
+                        options={
+                            'temperature': 0.7,
+                            'top_p': 0.9,
+                            'num_predict': num_predict, 
+                            'stop': None  
+                        }
+                    )
+                    parts = []
+                    word_count = 0
+                    in_word = False
+                    truncated = False
+                    try:
+                        async for chunk in stream:
+                            piece = chunk['message']['content']
+                            parts.append(piece)
+                            if max_words is None:
+                                continue
+                            for char in piece:
+                                if char.isspace():
+                                    in_word = False
+                                elif not in_word:
+                                    in_word = True
+                                    word_count += 1
+                            if word_count > max_words:
+                                truncated = True
+                                break
+                    finally:
+                        # Fermer le flux interrompt la génération côté serveur
+                        await stream.aclose()
+
+                content = ''.join(parts)
+                if truncated:
+                    logger.info(f"Génération interrompue après {max_words} mots")
+                    content = self._truncate_to_sentence(content)
+                return content
                 
             except Exception as e:
                 last_error = e
                 logger.warning(f"Tentative {attempt + 1}/{self.max_retries} échouée: {e}")
+                if not _is_retryable_ollama_error(e):
+                    break
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(1 * (attempt + 1))  # Backoff progressif
+                    await asyncio.sleep(_retry_delay(attempt))
         
         raise Exception(f"Impossible de générer l'horoscope après {self.max_retries} tentatives: {last_error}")
 
@@ -619,101 +917,180 @@ class AstroGenerator:
         last_error = None
         for attempt in range(self.max_retries):
             try:
-                response = ollama.chat(
-                    model=self.ollama_model,
-                    stream=False,
-                    think=False,
-                    messages=[{'role': 'user', 'content': prompt}],
-                    options={
-                        'temperature': 0.6,
-                        'top_p': 0.9,
-                        'num_predict': 8000,      
-                        'repeat_penalty': 1.1,   
-                        'top_k': 40,
-                        'stop': ["=== Fin"]             
-                    }
-                )
+                async with self._get_ollama_semaphore():
+                    response = await self._get_ollama_client().chat(
+                        model=self.ollama_model,
+                        stream=False,
+                        think=False,
+                        messages=[{'role': 'user', 'content': prompt}],
+                        options={
+                            'temperature': 0.6,
+                            'top_p': 0.9,
+                            'num_predict': 8000,      
+                            'repeat_penalty': 1.1,   
+                            'top_k': 40,
+                            'stop': ["=== Fin"]             
+                        }
+                    )
                 return response['message']['content']
                 
             except Exception as e:
                 last_error = e
                 logger.warning(f"Tentative {attempt + 1}/{self.max_retries} échouée: {e}")
+                if not _is_retryable_ollama_error(e):
+                    break
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(1 * (attempt + 1)) 
+                    await asyncio.sleep(_retry_delay(attempt))
         raise Exception(f"Impossible de générer l'analyse après {self.max_retries} tentatives: {last_error}")
 
     # =============================================================================
     # PROMPT SINGLE
     # =============================================================================
 
+    def _build_prompt_templates(self) -> Dict[str, Dict[str, str]]:
+        """Pré-remplit les templates avec les données fixes de chaque signe (seul le contexte du jour varie)"""
+        if not self.horoscope_prompts:
+            return {}
+        enriched = self.horoscope_prompts.get_enriched_horoscope_template()
+        individual = self.horoscope_prompts.get_individual_horoscope_template()
+
+        templates = {}
+        for sign_key, sign_data in self.signs_data.items():
+            sign_fields = _PartialFormatDict(
+                sign_name=sign_data.name,
+                sign_dates=sign_data.dates,
+                element=sign_data.element,
+                ruling_planet=sign_data.ruling_planet,
+                traits=', '.join(sign_data.traits),
+                min_words=self.horoscope_min_words,
+                max_words=self.horoscope_max_words
+            )
+            templates[sign_key] = {
+                "enriched": enriched.format_map(sign_fields),
+                "individual": individual.format_map(sign_fields)
+            }
+        return templates
+
     def _create_horoscope_prompt(self, sign, astral_context, astrochart_data=None):
         """Version modulaire du prompt d'horoscope"""
-        sign_data = self.get_sign_metadata(sign)
-        template = self.horoscope_prompts.get_enriched_horoscope_template()
+        templates = self._prompt_templates[sign]
+
+        if not astrochart_data:
+            planets_str = ', '.join(f"{p['name']} ({p['state']})" for p in astral_context.influential_planets) or "aucune"
+            return templates["individual"].format(
+                date=astral_context.date,
+                day_of_week=astral_context.day_of_week,
+                season=astral_context.season,
+                seasonal_energy=astral_context.seasonal_energy,
+                lunar_phase=astral_context.lunar_phase,
+                planets_str=planets_str
+            )
 
         chart_data = astrochart_data["chart_data"]
         positions = astrochart_data["positions"] 
         aspects = astrochart_data["aspects"]
         
-        positions_text = "POSITIONS PLANÉTAIRES EXACTES:\n"
+        # Lignes accumulées puis jointes une seule fois (pas de concaténations successives)
+        positions_lines = ["POSITIONS PLANÉTAIRES EXACTES:"]
         for planet in positions:
-            positions_text += f"- {planet.name} ({planet.symbol}): {planet.degree_in_sign:.1f}° en {planet.sign_name}"
-            if planet.retrograde:
-                positions_text += " (Rétrograde)"
-            positions_text += f" (longitude: {planet.longitude:.1f}°)\n"
+            retrograde = " (Rétrograde)" if planet.retrograde else ""
+            positions_lines.append(
+                f"- {planet.name} ({planet.symbol}): {planet.degree_in_sign:.1f}° en {planet.sign_name}"
+                f"{retrograde} (longitude: {planet.longitude:.1f}°)"
+            )
+        positions_text = "\n".join(positions_lines) + "\n"
         
-        aspects_text = "ASPECTS PLANÉTAIRES ACTIFS:\n"
+        aspects_lines = ["ASPECTS PLANÉTAIRES ACTIFS:"]
         if aspects:
             for aspect in aspects[:5]:
                 exactness = "EXACT" if aspect.exact else f"orbe {aspect.orb:.1f}°"
-                aspects_text += f"- {aspect.planet1} {aspect.aspect_type.upper()} {aspect.planet2} ({exactness})\n"
+                aspects_lines.append(f"- {aspect.planet1} {aspect.aspect_type.upper()} {aspect.planet2} ({exactness})")
         else:
-            aspects_text += "- Aucun aspect majeur aujourd'hui\n"
+            aspects_lines.append("- Aucun aspect majeur aujourd'hui")
+        aspects_text = "\n".join(aspects_lines) + "\n"
         
         lunar_info = f"PHASE LUNAIRE: {chart_data.moon_phase}"
-        return template.format(
+        return templates["enriched"].format(
             date=chart_data.date,
             positions_text=positions_text,
             aspects_text=aspects_text,
-            lunar_info=lunar_info,
-            sign_name=sign_data.name,
-            sign_dates=sign_data.dates,
-            element=sign_data.element,
-            ruling_planet=sign_data.ruling_planet,
-            traits=', '.join(sign_data.traits),
-            min_words=self.horoscope_min_words,
-            max_words=self.horoscope_max_words
+            lunar_info=lunar_info
         )
 
-    async def generate_single_horoscope(self, sign: str, date: Optional[datetime.date] = None, astrochart_data=None, generate_audio: bool = False):
+    def _compute_astrochart_data(self, date: datetime.date) -> Optional[Dict]:
+        """Calcule positions, aspects et données de carte pour une date (commun aux 12 signes)"""
+        if not (ASTROCHART_AVAILABLE and astro_calculator):
+            return None
+        try:
+            # Positions et aspects repris de la carte : un seul calcul pour les trois champs
+            chart_data = astro_calculator.generate_chart_data(date)
+            astrochart_data = {
+                "chart_data": chart_data,
+                "positions": chart_data.planets, 
+                "aspects": chart_data.aspects
+            }
+            logger.info("✅ AstroChart data calculée")
+            return astrochart_data
+        except Exception as e:
+            logger.warning(f"⚠️  Erreur AstroChart, fallback: {e}")
+            return None
+
+    async def generate_single_horoscope(self, sign: str, date: Optional[datetime.date] = None, astrochart_data=None,
+                                        generate_audio: bool = False, use_cache: bool = True):
+        """
+        Génère l'horoscope d'un signe ; retourne (résultat, chemin audio, durée audio).
+        Le cache n'est consulté que si use_cache est vrai et qu'aucune carte astrale n'est fournie
+        (use_cache=False force un nouveau texte, comme le bouton « régénérer » de l'interface).
+        """
         try:  
             validated_sign = self._validate_sign(sign)
             validated_date = date or datetime.date.today()
-            
-            sign_data = self.get_sign_metadata(validated_sign)
+        except Exception as e:  
+            logger.error(f"Erreur génération horoscope pour {sign}: {e}")
+            raise
+
+        # Cache LRU (signe, jour, audio) : évite de relancer Ollama pour un horoscope déjà généré.
+        # Une carte astrale fournie par l'appelant n'entre pas dans la clé : pas de cache dans ce cas
+        storable = astrochart_data is None
+        cache_key = (validated_sign, validated_date.toordinal(), generate_audio)
+        cached = self._horoscope_cache.get(cache_key) if use_cache and storable else None
+        if cached and (not cached[1] or os.path.exists(cached[1])):
+            self._horoscope_cache.move_to_end(cache_key)
+            logger.info(f"Horoscope {validated_sign} du {validated_date} servi depuis le cache")
+            return cached
+
+        try:
             astral_context = self.get_astral_context(validated_date)
+            if astrochart_data is None:
+                astrochart_data = self._compute_astrochart_data(validated_date)
+        except Exception as e:  
+            logger.error(f"Erreur génération horoscope pour {sign}: {e}")
+            raise
+
+        result = await self._generate_single_horoscope_with_context(
+            validated_sign, validated_date, astral_context, astrochart_data, generate_audio
+        )
+        # Un texte régénéré remplace l'entrée du cache ; un audio demandé mais raté n'est pas mémorisé
+        if storable and not (generate_audio and not result[1]):
+            self._horoscope_cache[cache_key] = result
+            self._horoscope_cache.move_to_end(cache_key)
+            if len(self._horoscope_cache) > self.horoscope_cache_size:
+                self._horoscope_cache.popitem(last=False)
+        return result
+
+    async def _generate_single_horoscope_with_context(self, validated_sign: str, validated_date: datetime.date,
+                                                      astral_context: AstralContext, astrochart_data=None,
+                                                      generate_audio: bool = False, allow_batch: bool = True):
+        """Génère un horoscope à partir d'un contexte astral et de données de carte déjà calculés"""
+        try:  
+            sign_data = self.get_sign_metadata(validated_sign)
             
-            astrochart_data = None
-            if ASTROCHART_AVAILABLE and astro_calculator:
-                try:
-                    positions = astro_calculator.calculate_positions(validated_date)
-                    astrochart_data = {
-                        "chart_data": astro_calculator.generate_chart_data(validated_date),
-                        "positions": positions, 
-                        "aspects": astro_calculator.calculate_aspects(positions)
-                    }
-                    logger.info("✅ AstroChart data calculée")
-                except Exception as e:
-                    logger.warning(f"⚠️  Erreur AstroChart, fallback: {e}")
-                    astrochart_data = None
-            
-            prompt = self._create_horoscope_prompt(validated_sign, astral_context, astrochart_data)
-            
-            logger.info(f"--- Prompt {'enrichi' if astrochart_data else 'standard'} envoyé à Ollama ---")
-            
-            horoscope_text = await self._call_ollama_with_retry(prompt)
+            if allow_batch and settings.HOROSCOPE_DAILY_BATCH and self._prompt_templates:
+                horoscope_text = await self._generate_text_in_batch(validated_sign, astral_context, astrochart_data)
+            else:
+                horoscope_text = await self._generate_text_alone(validated_sign, astral_context, astrochart_data)
             title_theme = await self._extract_title_theme(horoscope_text)
-            lunar_influence = self.calculate_lunar_influence(validated_sign, validated_date)
+            lunar_influence = self.calculate_lunar_influence(validated_sign, validated_date, astral_context)
             
             result = HoroscopeResult(
                 sign=sign_data.name,
@@ -723,7 +1100,7 @@ class AstroGenerator:
                 metadata=sign_data,
                 lunar_influence_score=lunar_influence,
                 generation_timestamp=datetime.datetime.now().isoformat(),
-                word_count=len(horoscope_text.split()),
+                word_count=_count_words(horoscope_text),
                 astrochart_data=astrochart_data,
                 title_theme=title_theme
             )
@@ -731,7 +1108,7 @@ class AstroGenerator:
             # Génération audio optionnelle
             audio_path, audio_duration = None, 0.0
             if generate_audio and TTS_AVAILABLE:
-                audio_path, audio_duration = self.generate_tts_audio(
+                audio_path, audio_duration = await self.generate_tts_audio_async(
                     horoscope_text, 
                     f"{validated_sign}_{validated_date.strftime('%Y%m%d')}"
                 )
@@ -741,41 +1118,190 @@ class AstroGenerator:
             return result, audio_path, audio_duration
             
         except Exception as e:  
-            logger.error(f"Erreur génération horoscope pour {sign}: {e}")
+            logger.error(f"Erreur génération horoscope pour {validated_sign}: {e}")
             raise     
 
-    async def generate_daily_horoscopes(self, date: Optional[datetime.date] = None) -> Dict[str, HoroscopeResult]:
-        """Génère tous les horoscopes du jour en parallèle"""
-        validated_date = date or datetime.date.today()
-        logger.info(f"Génération des horoscopes pour {validated_date}")
+    async def _generate_text_alone(self, sign_key: str, astral_context: AstralContext, astrochart_data=None) -> str:
+        """Texte d'un horoscope, une requête Ollama pour ce seul signe"""
+        prompt = self._create_horoscope_prompt(sign_key, astral_context, astrochart_data)
+        logger.info(f"--- Prompt {'enrichi' if astrochart_data else 'standard'} envoyé à Ollama ---")
+        return await self._call_ollama_with_retry(prompt, max_words=self.horoscope_max_words + 5)
+
+    async def _generate_text_in_batch(self, sign_key: str, astral_context: AstralContext, astrochart_data=None) -> str:
+        """Texte d'un horoscope ; les signes demandés dans la même fenêtre (même date, même carte) partagent une requête"""
+        self._bind_ollama_loop()
+        key = (astral_context.date, id(astrochart_data))
+        pending = self._pending_batches.get(key)
+        if pending is None:
+            pending = self._pending_batches[key] = {}
+            task = asyncio.get_running_loop().create_task(
+                self._flush_text_batch(key, pending, astral_context, astrochart_data)
+            )
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+        future = pending.get(sign_key)
+        if future is None:
+            future = pending[sign_key] = asyncio.get_running_loop().create_future()
+        # shield : un appelant annulé n'annule pas le texte attendu par les autres
+        return await asyncio.shield(future)
+
+    async def _flush_text_batch(self, key: tuple, pending: Dict[str, asyncio.Future],
+                                astral_context: AstralContext, astrochart_data=None) -> None:
+        """Fin de la fenêtre : une requête groupée, puis un signe à la fois pour ceux que la réponse n'a pas couverts"""
+        await asyncio.sleep(self.batch_window)
+        if self._pending_batches.get(key) is pending:
+            del self._pending_batches[key]
+
+        texts = {}
+        sign_keys = list(pending)
+        if len(sign_keys) > 1:
+            try:
+                prompt = self._create_daily_batch_prompt(astral_context, astrochart_data, sign_keys)
+                logger.info(f"--- Prompt groupé ({len(sign_keys)} signes) envoyé à Ollama ---")
+                content = await self._call_ollama_with_retry(
+                    prompt,
+                    num_predict=self._num_predict_for_words(self.horoscope_max_words + 10) * len(sign_keys),
+                    max_words=(self.horoscope_max_words + 10) * len(sign_keys)
+                )
+                texts = self._parse_daily_batch_response(content)
+            except Exception as e:
+                logger.warning(f"⚠️  Requête groupée échouée, génération signe par signe: {e}")
 
-        # Création des tâches parallèles
-        tasks = []
-        for sign_key in self.signs_data.keys():
-            task = self.generate_single_horoscope(sign_key, validated_date)
-            tasks.append((sign_key, task))
+        async def resolve(sign_key: str):
+            future = pending[sign_key]
+            try:
+                text = texts.get(sign_key)
+                if text is None:
+                    text = await self._generate_text_alone(sign_key, astral_context, astrochart_data)
+                if not future.done():
+                    future.set_result(text)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
 
-        # Exécution parallèle avec gestion d'erreur
-        results = await asyncio.gather(
-            *[task for _, task in tasks], 
-            return_exceptions=True
+        await asyncio.gather(*(resolve(sign_key) for sign_key in sign_keys))
+
+    def _parse_daily_batch_response(self, content: str) -> Dict[str, str]:
+        """Découpe la réponse groupée (**Signe:** texte) en textes par signe"""
+        horoscopes = {}
+        for match in self._daily_batch_pattern.finditer(content):
+            sign_key = self._sign_name_to_key[match.group(1)]
+            text = ' '.join(match.group(2).split())
+            if text:
+                horoscopes[sign_key] = text
+        return horoscopes
+
+    def _create_daily_batch_prompt(self, astral_context: AstralContext, astrochart_data=None,
+                                   sign_keys: Optional[List[str]] = None) -> str:
+        """Assemble les prompts enrichis des signes (les 12 par défaut) en une seule requête, avec un format de réponse balisé"""
+        sign_keys = sign_keys or list(self.signs_data)
+        sections = [
+            f"Rédige {len(sign_keys)} horoscopes indépendants, un par signe, en suivant pour chacun "
+            f"les consignes de sa section ci-dessous ({self.horoscope_min_words}-{self.horoscope_max_words} mots chacun).\n"
+            "FORMAT ATTENDU: chaque horoscope commence par une ligne **NomDuSigne:** suivie de son texte, "
+            "dans l'ordre des sections. Aucun autre texte."
+        ]
+        for sign_key in sign_keys:
+            sections.append(
+                f"=== SECTION {self.signs_data[sign_key].name} ===\n"
+                f"{self._create_horoscope_prompt(sign_key, astral_context, astrochart_data)}"
+            )
+        return "\n\n".join(sections)
+
+    async def _generate_daily_batch(self, date: datetime.date) -> Dict[str, HoroscopeResult]:
+        """Génère les horoscopes du jour en une seule requête Ollama ; seuls les signes bien découpés sont retournés"""
+        if not self._prompt_templates:
+            raise Exception("Prompts modulaires non disponibles")
+
+        astral_context = self.get_astral_context(date)
+        astrochart_data = self._compute_astrochart_data(date)
+        prompt = self._create_daily_batch_prompt(astral_context, astrochart_data)
+        
+        sign_count = len(self.signs_data)
+        # Budget par signe + en-têtes **Signe:** et mise en forme ; la coupe se fait au nombre de mots
+        content = await self._call_ollama_with_retry(
+            prompt,
+            # +10 mots par signe pour l'en-tête **NomDuSigne:** et la mise en forme markdown
+            num_predict=self._num_predict_for_words(self.horoscope_max_words + 10) * sign_count,
+            max_words=(self.horoscope_max_words + 10) * sign_count
         )
 
-        # Traitement des résultats
+        texts = self._parse_daily_batch_response(content)
+        titles = await asyncio.gather(*(self._extract_title_theme(text) for text in texts.values()))
+
+        timestamp = datetime.datetime.now().isoformat()
         horoscopes = {}
-        for i, (sign_key, _) in enumerate(tasks):
-            result = results[i]
-            if isinstance(result, Exception):
-                logger.error(f"Erreur génération {sign_key}: {result}")
-                horoscopes[sign_key] = {"error": str(result)}
-            else:
-                horoscopes[sign_key] = result[0]  # HoroscopeResult seulement
+        for (sign_key, horoscope_text), title_theme in zip(texts.items(), titles):
+            sign_data = self.signs_data[sign_key]
+            horoscopes[sign_key] = HoroscopeResult(
+                sign=sign_data.name,
+                date=astral_context.date,
+                horoscope_text=horoscope_text,
+                astral_context=astral_context,
+                metadata=sign_data,
+                lunar_influence_score=self.calculate_lunar_influence(sign_key, date, astral_context),
+                generation_timestamp=timestamp,
+                word_count=_count_words(horoscope_text),
+                astrochart_data=astrochart_data,
+                title_theme=title_theme
+            )
+        return horoscopes
+
+    async def generate_daily_horoscopes(self, date: Optional[datetime.date] = None) -> Dict[str, HoroscopeResult]:
+        """Génère tous les horoscopes du jour (signe par signe en parallèle, ou requête groupée si activée)"""
+        validated_date = date or datetime.date.today()
+        logger.info(f"Génération des horoscopes pour {validated_date}")
+
+        completed = {}
+        if settings.HOROSCOPE_DAILY_BATCH:
+            try:
+                completed = await self._generate_daily_batch(validated_date)
+                logger.info(f"Génération groupée: {len(completed)}/{len(self.signs_data)} horoscopes découpés")
+            except Exception as e:
+                logger.warning(f"⚠️  Génération groupée échouée, fallback signe par signe: {e}")
+
+        # Seuls les signes absents de la réponse groupée sont régénérés individuellement
+        missing = [sign_key for sign_key in self.signs_data if sign_key not in completed]
+        if missing:
+            async for sign_key, result in self.iter_daily_horoscopes(validated_date, sign_keys=missing,
+                                                                     allow_batch=False):
+                completed[sign_key] = result
+        # Ordre zodiacal, quel que soit l'ordre d'achèvement
+        horoscopes = {sign_key: completed[sign_key] for sign_key in self.signs_data}
 
         success_count = sum(1 for r in horoscopes.values() if not isinstance(r, dict) or "error" not in r)
         logger.info(f"Génération terminée: {success_count}/{len(self.signs_data)} horoscopes créés")
 
         return horoscopes
                 
+    async def iter_daily_horoscopes(self, date: Optional[datetime.date] = None, sign_keys: Optional[List[str]] = None,
+                                    allow_batch: bool = True) -> AsyncIterator[Tuple[str, Union[HoroscopeResult, Dict[str, str]]]]:
+        """Génère les horoscopes du jour signe par signe (tous, ou sign_keys), livrés dans l'ordre d'achèvement"""
+        validated_date = date or datetime.date.today()
+
+        # Contexte astral et carte calculés une seule fois pour les 12 signes
+        astral_context = self.get_astral_context(validated_date)
+        astrochart_data = self._compute_astrochart_data(validated_date)
+
+        async def generate(sign_key: str):
+            try:
+                result = await self._generate_single_horoscope_with_context(
+                    sign_key, validated_date, astral_context, astrochart_data, allow_batch=allow_batch
+                )
+                return sign_key, result[0]  # HoroscopeResult seulement
+            except Exception as e:
+                logger.error(f"Erreur génération {sign_key}: {e}")
+                return sign_key, {"error": str(e)}
+
+        tasks = [asyncio.ensure_future(generate(sign_key)) for sign_key in (sign_keys or self.signs_data)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consommateur interrompu : inutile de laisser tourner les générations restantes
+            for task in tasks:
+                task.cancel()
+
     async def generate_single_weekly_sign(self, sign_key: str, events_str: str, period: str):
         """Génère le conseil hebdomadaire pour un seul signe"""
         # Validation et métadonnées (comme dans votre méthode existante)
@@ -794,8 +1320,8 @@ class AstroGenerator:
             traits=', '.join(sign_data.traits)
         )
         
-        # Génération optimisée pour contenu court
-        content = await self._call_ollama_with_retry(prompt)
+        # Génération optimisée pour contenu court (200 à 300 mots d'après le template)
+        content = await self._call_ollama_with_retry(prompt, num_predict=self._num_predict_for_words(300))
         
         # Validation basique
         if f"{sign_data.name} :" not in content:
@@ -859,18 +1385,19 @@ class AstroGenerator:
         template = TitlePromptTemplates.get_indivual_title_template()
         prompt = template.format(horoscope_text=horoscope_text)
         try:
-            response = ollama.chat(
-                model=self.ollama_model,
-                stream=False,
-                think=False,
-                messages=[{'role': 'user', 'content': prompt}],
-                options={
-                    'temperature': 0.9,      # Plus créatif
-                    'top_p': 0.8,           # Moins prévisible
-                    'num_predict': 50,      # Titre court
-                    'repeat_penalty': 1.3   # Évite répétitions
-                }
-            )
+            async with self._get_ollama_semaphore():
+                response = await self._get_ollama_client().chat(
+                    model=self.ollama_model,
+                    stream=False,
+                    think=False,
+                    messages=[{'role': 'user', 'content': prompt}],
+                    options={
+                        'temperature': 0.9,      # Plus créatif
+                        'top_p': 0.8,           # Moins prévisible
+                        'num_predict': 50,      # Titre court
+                        'repeat_penalty': 1.3   # Évite répétitions
+                    }
+                )
             return response['message']['content'].strip().replace('"', '').strip()
         except Exception as e:
             return "Découverte astrologique unique"
@@ -878,6 +1405,13 @@ class AstroGenerator:
     # =============================================================================
     # TTS
     # =============================================================================
+    def _get_audio_duration(self, audio_path: str) -> float:
+        """Durée lue dans l'en-tête MP3, mutagen seulement si l'en-tête n'est pas exploitable"""
+        duration = _mp3_duration_from_header(audio_path)
+        if duration is None:
+            duration = MP3(audio_path).info.length
+        return duration
+
     def generate_tts_audio(self, text: str, filename: str) -> Tuple[Optional[str], float]:
         """Génère un fichier audio à partir du texte"""
         if not TTS_AVAILABLE:
@@ -891,7 +1425,7 @@ class AstroGenerator:
             if os.path.exists(output_path):
                 logger.info(f"Fichier audio existant trouvé: {output_path}")
                 try:
-                    duration = MP3(output_path).info.length
+                    duration = self._get_audio_duration(output_path)
                     return output_path, duration
                 except:
                     # Si erreur de lecture, régénérer
@@ -905,6 +1439,16 @@ class AstroGenerator:
             normalized_text = ' '.join(cleaned_text.replace('\n', ' ').split())
             logger.info(f"Texte nettoyé: {len(text)} → {len(normalized_text)} caractères")
             logger.info(f"Emojis supprimés: {len(text.split()) - len(normalized_text.split())} mots")
+
+            # Texte déjà synthétisé sous un autre nom : lien local au lieu d'un appel réseau
+            text_hash = hashlib.blake2b(f"{self.audio_lang}:{normalized_text}".encode('utf-8'), digest_size=16).hexdigest()
+            cached = self._tts_hash_cache.get(text_hash)
+            if cached:
+                if self._link_or_copy(cached[0], output_path):
+                    logger.info(f"Audio réutilisé depuis le cache: {cached[0]} → {output_path}")
+                    return output_path, cached[1]
+                # Fichier source supprimé depuis (purge des données) : entrée périmée, nouvelle synthèse
+                self._tts_hash_cache.pop(text_hash, None)
             
             # Générer le fichier audio avec le texte nettoyé
             tts = gTTS(text=normalized_text, lang=self.audio_lang, slow=False)
@@ -912,12 +1456,13 @@ class AstroGenerator:
             
             # Obtenir la durée
             try:
-                duration = MP3(output_path).info.length
+                duration = self._get_audio_duration(output_path)
             except:
                 # Estimation approximative si erreur de lecture
                 duration = len(text.split()) * 0.5  # ~0.5 sec par mot
                 logger.warning(f"Impossible de lire la durée, estimation: {duration:.1f}s")
             
+            self._tts_hash_cache[text_hash] = (output_path, duration)
             logger.info(f"Audio généré: {output_path} (Durée: {duration:.2f}s)")
             return output_path, duration
             
@@ -925,6 +1470,28 @@ class AstroGenerator:
             logger.error(f"Erreur génération TTS: {e}")
             return None, 0.0
 
+    @staticmethod
+    def _link_or_copy(source: str, destination: str) -> bool:
+        """Hardlink (aucun octet copié), sinon copie ; False si la source n'existe plus"""
+        if not os.path.exists(source):
+            return False
+        try:
+            os.link(source, destination)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            # Autre système de fichiers, ou liens non supportés
+            try:
+                shutil.copy2(source, destination)
+            except FileNotFoundError:
+                return False
+        return True
+
+    async def generate_tts_audio_async(self, text: str, filename: str) -> Tuple[Optional[str], float]:
+        """Exécute generate_tts_audio (gTTS, bloquant) dans le pool TTS sans bloquer la boucle asyncio"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._tts_executor, self.generate_tts_audio, text, filename)
+
     # =============================================================================
     # MÉTHODES UTILITAIRES SUPPLÉMENTAIRES
     # =============================================================================
@@ -938,39 +1505,56 @@ class AstroGenerator:
             "weekly_generator_available": self.weekly_generator is not None,
             "weekly_module_available": WEEKLY_MODULE_AVAILABLE,
             "signs_count": len(self.signs_data),
+            "ollama_parallel": self.ollama_parallel,
             "audio_files_count": 0
 
         }
         
         # Compter les fichiers audio
         try:
-            audio_files = [f for f in os.listdir(self.audio_output_dir) if f.endswith('.mp3')]
-            status["audio_files_count"] = len(audio_files)
+            status["audio_files_count"] = self._count_audio_files()
         except:
             pass
         
         return status
 
+    def _count_audio_files(self) -> int:
+        """Compte les mp3 générés, en ne relistant le dossier que si son mtime a changé"""
+        dir_mtime = os.stat(self.audio_output_dir).st_mtime_ns
+        if self._audio_files_cache and self._audio_files_cache[0] == dir_mtime:
+            return self._audio_files_cache[1]
+
+        with os.scandir(self.audio_output_dir) as entries:
+            count = sum(1 for entry in entries if entry.name.endswith('.mp3'))
+        self._audio_files_cache = (dir_mtime, count)
+        return count
+
     def export_horoscopes_data(self, horoscopes: Dict) -> str:
         """Exporte les horoscopes au format JSON."""
         try:
             export_data = {
                 "export_timestamp": datetime.datetime.now().isoformat(),
                 "total_horoscopes": len(horoscopes),
-                "horoscopes": {}
+                # Même sérialisation que les outils MCP (HoroscopeResult.to_dict)
+                "horoscopes": {
+                    sign: h.to_dict() if isinstance(h, HoroscopeResult) else h
+                    for sign, h in horoscopes.items()
+                }
             }
             
-            for sign_key, horoscope in horoscopes.items():
-                if isinstance(horoscope, HoroscopeResult):
-                    export_data["horoscopes"][sign_key] = asdict(horoscope)
-                else:
-                    export_data["horoscopes"][sign_key] = horoscope
-            
             filename = f"horoscopes_export_{datetime.date.today().strftime('%Y%m%d')}.json"
             filepath = os.path.join(self.audio_output_dir, filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
+            if ORJSON_AVAILABLE:
+                with open(filepath, 'wb') as f:
+                    f.write(orjson.dumps(
+                        export_data,
+                        default=_dataclass_default,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                    ))
+            else:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump(export_data, f, ensure_ascii=False, indent=2, default=_dataclass_default)
             
             logger.info(f"Export réussi: {filepath}")
             return filepath
@@ -999,13 +1583,13 @@ if FASTMCP_AVAILABLE:
             result = {}
             for key, h in horoscopes.items():
                 if isinstance(h, HoroscopeResult):
-                    result[key] = asdict(h)
+                    result[key] = h.to_dict()
                 else:
                     result[key] = h
             
             return {
                 "success": True, 
-                "date": parse_date.strftime("%Y-%m-%d"),
+                "date": parse_date.isoformat(),
                 "horoscopes": result,
                 "total_generated": len([h for h in result.values() if "error" not in h])
             }
@@ -1014,6 +1598,31 @@ if FASTMCP_AVAILABLE:
             logger.error(f"Erreur tool generate_daily_horoscopes: {e}")
             return {"success": False, "error": str(e)}
 
+    @mcp.tool()
+    async def generate_daily_horoscopes_stream_tool(date: Optional[str] = None, ctx: Optional[Context] = None) -> dict:
+        """Génère les horoscopes du jour en signalant chaque signe dès qu'il est prêt."""
+        try:
+            parse_date = astro_generator._validate_date(date)
+            total = len(astro_generator.signs_data)
+            
+            result = {}
+            async for sign_key, h in astro_generator.iter_daily_horoscopes(parse_date):
+                result[sign_key] = h.to_dict() if isinstance(h, HoroscopeResult) else h
+                if ctx is not None:
+                    await ctx.info(f"Horoscope {sign_key} prêt")
+                    await ctx.report_progress(len(result), total)
+            
+            return {
+                "success": True, 
+                "date": parse_date.isoformat(),
+                "horoscopes": result,
+                "total_generated": len([h for h in result.values() if "error" not in h])
+            }
+            
+        except Exception as e:
+            logger.error(f"Erreur tool generate_daily_horoscopes_stream: {e}")
+            return {"success": False, "error": str(e)}
+
     @mcp.tool()
     async def generate_single_horoscope_with_audio_tool(sign: str, date: Optional[str] = None) -> dict:
         """Génère un horoscope et son fichier audio TTS."""
@@ -1027,7 +1636,7 @@ if FASTMCP_AVAILABLE:
             
             return {
                 "success": True, 
-                "horoscope": asdict(horoscope_result),
+                "horoscope": horoscope_result.to_dict(),
                 "audio_path": audio_path,
                 "audio_duration_seconds": audio_duration
             }
@@ -1045,7 +1654,7 @@ if FASTMCP_AVAILABLE:
             
             return {
                 "success": True,
-                "context": asdict(context)
+                "context": context.to_dict()
             }
             
         except Exception as e:
@@ -1053,7 +1662,7 @@ if FASTMCP_AVAILABLE:
             return {"success": False, "error": str(e)}
 
 @mcp.tool()
-def generate_chart_image_tool(date: Optional[str] = None) -> dict:
+async def generate_chart_image_tool(date: Optional[str] = None) -> dict:
     """
     Génère une image de carte astrologique pour une date donnée.
     """
@@ -1073,8 +1682,8 @@ def generate_chart_image_tool(date: Optional[str] = None) -> dict:
         # Validation de la date
         target_date = astro_generator._validate_date(date)
         
-        # Réutilisation des calculs existants d'AstroCalculator
-        positions = astro_calculator.calculate_positions(target_date)
+        # Réutilisation de la carte du jour déjà calculée par AstroCalculator
+        positions, _, _ = await asyncio.to_thread(astro_calculator.get_chart, target_date)
         
         if not positions:
             return {
@@ -1082,8 +1691,8 @@ def generate_chart_image_tool(date: Optional[str] = None) -> dict:
                 "error": "Impossible de calculer les positions planétaires"
             }
         
-        # Génération de l'image directement
-        chart_path = astro_generator.chart_generator.create_chart_from_positions(
+        # Rendu dans le pool de processus : la boucle MCP reste disponible
+        chart_path = await astro_generator.chart_generator.render_chart_async(
             positions, target_date
         )
         
@@ -1115,7 +1724,7 @@ def generate_chart_image_tool(date: Optional[str] = None) -> dict:
             if metadata:
                 return {
                     "success": True,
-                    "metadata": asdict(metadata)
+                    "metadata": metadata.to_dict()
                 }
             else:
                 return {
@@ -1153,7 +1762,7 @@ def generate_chart_image_tool(date: Optional[str] = None) -> dict:
                 "date": date,
                 "lunar_influence_score": round(influence, 3),
                 "interpretation": interpretation,
-                "astral_context": asdict(astro_generator.get_astral_context(parse_date))
+                "astral_context": astro_generator.get_astral_context(parse_date).to_dict()
             }
             
         except Exception as e:
@@ -1182,7 +1791,7 @@ def generate_chart_image_tool(date: Optional[str] = None) -> dict:
             return {
                 "success": True,
                 "export_path": export_path,
-                "date": parse_date.strftime("%Y-%m-%d"),
+                "date": parse_date.isoformat(),
                 "total_horoscopes": len(horoscopes)
             }
             
@@ -1201,6 +1810,9 @@ if __name__ == "__main__":
     print(f"   • Modèle Ollama: {astro_generator.ollama_model}")
     print(f"   • Dossier audio: {astro_generator.audio_output_dir}")
     print(f"   • Max retries: {astro_generator.max_retries}")
+    print(f"   • Requêtes Ollama parallèles: {astro_generator.ollama_parallel} (OLLAMA_NUM_PARALLEL)")
+    if astro_generator.ollama_parallel < len(astro_generator.signs_data):
+        print(f"     💡 Démarrer Ollama avec OLLAMA_NUM_PARALLEL={len(astro_generator.signs_data)} pour générer les 12 signes en une vague")
     
     print(f"📦 Dépendances:")
     print(f"   • Ollama: {'✅' if status['ollama_available'] else '❌'}")
@@ -1217,7 +1829,10 @@ if __name__ == "__main__":
     # Démarrage du serveur FastMCP
     if FASTMCP_AVAILABLE:
         print(f"🚀 Démarrage du serveur MCP...")
-        mcp.run()
+        try:
+            mcp.run()
+        finally:
+            asyncio.run(astro_generator.aclose())
     else:
         print("⚠️  FastMCP non disponible, serveur MCP non démarré")
         print("💡 Le générateur peut être utilisé en mode module")
\ No newline at end of file
@@ -4,13 +4,20 @@ MCP Astro Chart Server - Calculs Astronomiques Purs
 Serveur MCP dédié aux positions planétaires et calculs astronomiques
 """
 
+import asyncio
+import bisect
 import datetime
+import functools
+import json
 import logging
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
 from pathlib import Path
-from skyfield.api import Loader
-import json
+import numpy as np
+from skyfield.api import Loader, load_file
 
 try:
     from fastmcp import FastMCP
@@ -18,13 +25,44 @@ try:
 except ImportError:
     FASTMCP_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 DATA_DIR = Path(__file__).parent.resolve()
 load = Loader(DATA_DIR, verbose=False)
 
+# Éphéméride embarquée (surchargeable, ex. image conteneur avec le fichier pré-installé)
+EPHEMERIS_PATH = Path(os.environ.get('ASTRO_EPHEMERIS', DATA_DIR / 'de440s.bsp'))
+
+# Phases lunaires par quadrant d'élongation Soleil-Lune (0° = nouvelle lune)
+MOON_PHASE_BOUNDS = (90, 180, 270)
+MOON_PHASE_NAMES = ("Nouvelle Lune", "Premier Quartier", "Pleine Lune", "Dernier Quartier")
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+@functools.lru_cache(maxsize=None)
+def get_ephemeris():
+    """Éphéméride DE440s ouverte une seule fois par processus.
+
+    Le fichier BSP est lu via mmap : ouvert avant un fork, ses pages sont
+    partagées entre les workers au lieu d'être rechargées par chacun.
+    """
+    if EPHEMERIS_PATH.exists():
+        # Ouverture directe, sans passer par le Loader (ni réseau ni métadonnées)
+        return load_file(str(EPHEMERIS_PATH))
+    logger.warning(f"⚠️ Éphéméride absente ({EPHEMERIS_PATH}), téléchargement de de440s.bsp")
+    return load('de440s.bsp')
+
+@functools.lru_cache(maxsize=None)
+def get_timescale():
+    """Échelle de temps Skyfield partagée (données UT1/ΔT intégrées, sans téléchargement)"""
+    return load.timescale(builtin=True)
+
+@dataclass(slots=True, frozen=True)
 class PlanetaryPosition:
     """Position d'une planète"""
     name: str
@@ -35,7 +73,18 @@ class PlanetaryPosition:
     degree_in_sign: float
     retrograde: bool = False
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'symbol': self.symbol,
+            'longitude': self.longitude,
+            'sign_index': self.sign_index,
+            'sign_name': self.sign_name,
+            'degree_in_sign': self.degree_in_sign,
+            'retrograde': self.retrograde
+        }
+
+@dataclass(slots=True, frozen=True)
 class AstralAspect:
     """Aspect entre deux planètes"""
     planet1: str
@@ -44,7 +93,16 @@ class AstralAspect:
     orb: float
     exact: bool
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'planet1': self.planet1,
+            'planet2': self.planet2,
+            'aspect_type': self.aspect_type,
+            'orb': self.orb,
+            'exact': self.exact
+        }
+
+@dataclass(slots=True, frozen=True)
 class AstroChartData:
     """Données complètes d'une carte astrologique"""
     date: str
@@ -56,12 +114,24 @@ class AstroChartData:
     houses: Optional[Dict] = None  # Pour futur usage
     calculation_method: str = "skyfield_de440s"
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'date': self.date,
+            'timestamp': self.timestamp,
+            'sun_sign': self.sun_sign,
+            'moon_phase': self.moon_phase,
+            'planets': [planet.to_dict() for planet in self.planets],
+            'aspects': [aspect.to_dict() for aspect in self.aspects],
+            'houses': dict(self.houses) if self.houses is not None else None,
+            'calculation_method': self.calculation_method
+        }
+
 class AstroCalculator:
     """Calculateur astronomique pur"""
     
     def __init__(self):
-        self.planets_data = load('de440s.bsp')
-        self.ts = load.timescale()
+        self.planets_data = get_ephemeris()
+        self.ts = get_timescale()
         self.earth = self.planets_data[399]
         
         # Codes planétaires
@@ -89,36 +159,109 @@ class AstroCalculator:
             'Bélier', 'Taureau', 'Gémeaux', 'Cancer', 'Lion', 'Vierge',
             'Balance', 'Scorpion', 'Sagittaire', 'Capricorne', 'Verseau', 'Poissons'
         ]
+
+        # Objets Skyfield et métadonnées résolus une fois pour toutes, dans l'ordre de planet_codes ;
+        # les codes absents de l'éphéméride sont écartés ici plutôt qu'à chaque calcul
+        self._planet_objs = []
+        for key, code in self.planet_codes.items():
+            try:
+                self._planet_objs.append((key, self.planets_data[code]))
+            except KeyError:
+                logger.warning(f"Planète {key} (code {code}) absente de l'éphéméride, ignorée")
+
+        # Noms et symboles à plat, alignés sur _planet_objs
+        self._planet_names = tuple(self.planet_info[key]['name'] for key, _ in self._planet_objs)
+        self._planet_symbols = tuple(self.planet_info[key]['symbol'] for key, _ in self._planet_objs)
+        self._zodiac_names = tuple(self.zodiac_names)
+
+        # Aspects majeurs et leurs orbes, triés par angle cible
+        aspects_sorted = [
+            (0, 8, 'conjunction'),      # 0° ± 8°
+            (60, 4, 'sextile'),         # 60° ± 4°
+            (90, 6, 'square'),          # 90° ± 6°
+            (120, 6, 'trine'),          # 120° ± 6°
+            (180, 8, 'opposition'),     # 180° ± 8°
+        ]
+        self._aspect_names = tuple(name for _, _, name in aspects_sorted)
+        self._aspect_targets = np.array([target for target, _, _ in aspects_sorted], dtype=float)
+        self._aspect_orbs = np.array([orb for _, orb, _ in aspects_sorted], dtype=float)
+        # Bornes à mi-chemin entre cibles voisines : chaque écart n'a qu'un aspect candidat,
+        # le plus proche (les orbes ne se chevauchent pas)
+        self._aspect_bin_edges = (self._aspect_targets[:-1] + self._aspect_targets[1:]) / 2
     
+    def warm_up(self) -> None:
+        """Paie au démarrage le coût du premier calcul (pages de l'éphéméride, nutation, numpy)"""
+        try:
+            reference_date = datetime.date(2000, 1, 1)
+            self.calculate_positions_batch([reference_date])
+            t = self.ts.utc(reference_date.year, reference_date.month, reference_date.day, 12, 0, 0)
+            self._moon_elongation(t)
+            logger.info("✅ Calculateur astronomique préchauffé")
+        except Exception as e:
+            logger.warning(f"⚠️ Préchauffage du calculateur impossible: {e}")
+
     def calculate_positions(self, date: datetime.date) -> List[PlanetaryPosition]:
-        """Calcule les positions planétaires pour une date"""
-        t = self.ts.utc(date.year, date.month, date.day, 12, 0, 0)
+        """Calcule les positions planétaires pour une date (mises en cache par jour)"""
+        return list(self._calculate_positions_cached(date.toordinal()))
+
+    @functools.lru_cache(maxsize=512)
+    def _calculate_positions_cached(self, ordinal: int) -> tuple:
+        return tuple(self.calculate_positions_batch([datetime.date.fromordinal(ordinal)])[0])
+
+    def calculate_positions_batch(self, dates: List[datetime.date]) -> List[List[PlanetaryPosition]]:
+        """Calcule les positions pour plusieurs dates avec un seul vecteur de temps Skyfield"""
+        if not dates:
+            return []
+        # Chaque date est encadrée par la veille et le lendemain (pour la rétrogradation) ;
+        # Skyfield normalise les jours hors mois (0, 32...)
+        t = self.ts.utc(
+            [d.year for d in dates for _ in range(3)],
+            [d.month for d in dates for _ in range(3)],
+            [d.day + offset for d in dates for offset in (-1, 0, 1)],
+            12, 0, 0
+        )
+        longitudes = self._observe_longitudes(t).reshape(len(self._planet_objs), len(dates), 3)
+
+        # Mouvement apparent sur deux jours ramené dans [-180°, 180°) : négatif = rétrograde
+        motion = (longitudes[:, :, 2] - longitudes[:, :, 0] + 180.0) % 360.0 - 180.0
+        retrograde = motion < 0
+
+        return [
+            self._build_positions(longitudes[:, i, 1], retrograde[:, i])
+            for i in range(len(dates))
+        ]
+
+    def _observe_longitudes(self, t):
+        """Longitudes écliptiques géocentriques de chaque planète (t scalaire ou vecteur)"""
+        earth_at = self.earth.at(t)
+
+        longitudes = []
+        for planet_key, planet in self._planet_objs:
+            lat, lon, distance = earth_at.observe(planet).ecliptic_latlon()
+            longitudes.append(lon.degrees)
+
+        return np.asarray(longitudes, dtype=float)
+
+    def _build_positions(self, longitudes: np.ndarray, retrograde: np.ndarray) -> List[PlanetaryPosition]:
+        # Signe et degré dans le signe pour toutes les planètes en une opération
+        sign_indices, degrees_in_sign = np.divmod(longitudes, 30.0)
+
+        zodiac_names = self._zodiac_names
         positions = []
-        
-        for planet_key, planet_code in self.planet_codes.items():
-            try:
-                planet = self.planets_data[planet_code]
-                astrometric = self.earth.at(t).observe(planet)
-                lat, lon, distance = astrometric.ecliptic_latlon()
-                
-                sign_index = int(lon.degrees // 30)
-                degree_in_sign = lon.degrees % 30
-                
-                position = PlanetaryPosition(
-                    name=self.planet_info[planet_key]['name'],
-                    symbol=self.planet_info[planet_key]['symbol'],
-                    longitude=lon.degrees,
-                    sign_index=sign_index,
-                    sign_name=self.zodiac_names[sign_index],
-                    degree_in_sign=degree_in_sign,
-                    retrograde=False  # TODO: Calculer rétrogradation
-                )
-                
-                positions.append(position)
-                
-            except Exception as e:
-                logger.error(f"Erreur calcul {planet_key}: {e}")
-                continue
+        for name, symbol, longitude, sign_index, degree_in_sign, is_retrograde in zip(
+            self._planet_names, self._planet_symbols,
+            longitudes.tolist(), sign_indices.astype(int).tolist(), degrees_in_sign.tolist(),
+            retrograde.tolist()
+        ):
+            positions.append(PlanetaryPosition(
+                name=name,
+                symbol=symbol,
+                longitude=longitude,
+                sign_index=sign_index,
+                sign_name=zodiac_names[sign_index],
+                degree_in_sign=degree_in_sign,
+                retrograde=is_retrograde
+            ))
         
         return positions
     
@@ -126,70 +269,77 @@ class AstroCalculator:
         """Calcule les aspects entre planètes"""
         aspects = []
         
-        # Aspects majeurs et leurs orbes
-        aspect_definitions = {
-            'conjunction': (0, 8),      # 0° ± 8°
-            'opposition': (180, 8),     # 180° ± 8°
-            'trine': (120, 6),          # 120° ± 6°
-            'square': (90, 6),          # 90° ± 6°
-            'sextile': (60, 4),         # 60° ± 4°
-        }
-        
-        # Comparer chaque paire de planètes
-        for i, planet1 in enumerate(positions):
-            for planet2 in positions[i+1:]:
-                angle_diff = abs(planet1.longitude - planet2.longitude)
-                if angle_diff > 180:
-                    angle_diff = 360 - angle_diff
-                
-                # Vérifier chaque aspect
-                for aspect_name, (target_angle, orb) in aspect_definitions.items():
-                    if abs(angle_diff - target_angle) <= orb:
-                        actual_orb = abs(angle_diff - target_angle)
-                        aspects.append(AstralAspect(
-                            planet1=planet1.name,
-                            planet2=planet2.name,
-                            aspect_type=aspect_name,
-                            orb=actual_orb,
-                            exact=(actual_orb <= 2.0)
-                        ))
-                        break
+        if len(positions) < 2:
+            return aspects
+
+        # Matrice des écarts angulaires (0-180°) entre toutes les paires de planètes
+        longitudes = np.array([p.longitude for p in positions])
+        angle_diff = np.abs(longitudes[:, None] - longitudes[None, :])
+        angle_diff = np.minimum(angle_diff, 360 - angle_diff)
+        upper_pairs = np.triu(np.ones(angle_diff.shape, dtype=bool), 1)
+
+        # Aspect candidat le plus proche par paire, retenu s'il est dans son orbe (-1 = aucun)
+        nearest = np.searchsorted(self._aspect_bin_edges, angle_diff)
+        in_orb = np.abs(angle_diff - self._aspect_targets[nearest]) <= self._aspect_orbs[nearest]
+        aspect_index = np.where(in_orb & upper_pairs, nearest, -1)
+
+        # argwhere parcourt les paires dans l'ordre (i, j) de l'ancienne double boucle
+        for i, j in np.argwhere(aspect_index >= 0).tolist():
+            k = aspect_index[i, j]
+            actual_orb = abs(float(angle_diff[i, j]) - float(self._aspect_targets[k]))
+            aspects.append(AstralAspect(
+                planet1=positions[i].name,
+                planet2=positions[j].name,
+                aspect_type=self._aspect_names[k],
+                orb=actual_orb,
+                exact=(actual_orb <= 2.0)
+            ))
         
         return aspects
     
     def get_moon_phase(self, date: datetime.date) -> str:
         """Calcule la phase lunaire"""
-        # Logique simplifiée (à améliorer avec Skyfield)
-        reference = datetime.date(2024, 1, 11)  # Nouvelle lune de référence
-        days_since = (date - reference).days
-        lunar_cycle = days_since % 29.5
-        
-        if lunar_cycle < 7.4:
-            return "Nouvelle Lune"
-        elif lunar_cycle < 14.8:
-            return "Premier Quartier"
-        elif lunar_cycle < 22.1:
-            return "Pleine Lune"
-        else:
-            return "Dernier Quartier"
+        return self._moon_phase_cached(date.toordinal())
+
+    def _moon_elongation(self, t) -> float:
+        """Élongation Soleil-Lune en degrés (skyfield.almanac importé au premier usage)"""
+        from skyfield import almanac
+        return almanac.moon_phase(self.planets_data, t).degrees
+
+    @functools.lru_cache(maxsize=512)
+    def _moon_phase_cached(self, ordinal: int) -> str:
+        date = datetime.date.fromordinal(ordinal)
+        t = self.ts.utc(date.year, date.month, date.day, 12, 0, 0)
+        elongation = self._moon_elongation(t)
+        return MOON_PHASE_NAMES[bisect.bisect_right(MOON_PHASE_BOUNDS, elongation)]
     
-    def generate_chart_data(self, date: datetime.date) -> AstroChartData:
-        """Génère toutes les données d'une carte astrologique"""
+    def get_chart(self, date: datetime.date) -> Tuple[Tuple[PlanetaryPosition, ...], Tuple[AstralAspect, ...], str]:
+        """(positions, aspects, phase lunaire) d'une date, calculés une seule fois par jour (tuples partagés, ne pas modifier)"""
+        return self._get_chart_cached(date.toordinal())
+
+    @functools.lru_cache(maxsize=256)
+    def _get_chart_cached(self, ordinal: int) -> tuple:
+        """(positions, aspects, phase lunaire) d'une date, calculés une seule fois par jour"""
+        date = datetime.date.fromordinal(ordinal)
         positions = self.calculate_positions(date)
         aspects = self.calculate_aspects(positions)
-        moon_phase = self.get_moon_phase(date)
+        return tuple(positions), tuple(aspects), self.get_moon_phase(date)
+
+    def generate_chart_data(self, date: datetime.date) -> AstroChartData:
+        """Génère toutes les données d'une carte astrologique"""
+        positions, aspects, moon_phase = self.get_chart(date)
         
         # Trouver le signe solaire
         sun_position = next((p for p in positions if p.name == 'Soleil'), None)
         sun_sign = sun_position.sign_name if sun_position else "Inconnu"
         
         return AstroChartData(
-            date=date.strftime('%Y-%m-%d'),
+            date=date.isoformat(),
             timestamp=datetime.datetime.now().isoformat(),
             sun_sign=sun_sign,
             moon_phase=moon_phase,
-            planets=positions,
-            aspects=aspects,
+            planets=list(positions),
+            aspects=list(aspects),
             calculation_method="skyfield_de440s"
         )
         
@@ -199,17 +349,20 @@ class AstroCalculator:
         Retourne une liste d'événements (Ingrès, Phases lunaires, Aspects exacts).
         """
         events = []
-        previous_positions = self.calculate_positions(start_date - datetime.timedelta(days=1))
-
-        for day_offset in range((end_date - start_date).days + 1):
-            current_date = start_date + datetime.timedelta(days=day_offset)
-            current_positions = self.calculate_positions(current_date)
+        # Toutes les positions de la période (veille comprise) en un seul calcul vectorisé
+        period_dates = [
+            start_date + datetime.timedelta(days=day_offset)
+            for day_offset in range(-1, (end_date - start_date).days + 1)
+        ]
+        period_positions = self.calculate_positions_batch(period_dates)
+        previous_positions = period_positions[0]
 
+        for current_date, current_positions in zip(period_dates[1:], period_positions[1:]):
             # 1. Détecter les Ingrès (changement de signe)
             for i, planet in enumerate(current_positions):
                 if planet.sign_name != previous_positions[i].sign_name:
                     events.append({
-                        "date": current_date.strftime('%Y-%m-%d'),
+                        "date": current_date.isoformat(),
                         "type": "Ingrès",
                         "description": f"{planet.name} entre en {planet.sign_name}"
                     })
@@ -220,7 +373,7 @@ class AstroCalculator:
                 # Éviter les doublons si la phase dure plusieurs jours
                 if not any(e.get("description") == moon_phase for e in events):
                     events.append({
-                        "date": current_date.strftime('%Y-%m-%d'),
+                        "date": current_date.isoformat(),
                         "type": "Phase Lunaire",
                         "description": moon_phase
                     })
@@ -230,7 +383,7 @@ class AstroCalculator:
             for aspect in aspects:
                 if aspect.exact:
                     events.append({
-                        "date": current_date.strftime('%Y-%m-%d'),
+                        "date": current_date.isoformat(),
                         "type": "Aspect Exact",
                         "description": f"{aspect.planet1} {aspect.aspect_type} {aspect.planet2}"
                     })
@@ -240,15 +393,38 @@ class AstroCalculator:
         # Optionnel : Filtrer pour ne garder que les événements uniques par description
         unique_events = list({event['description']: event for event in events}.values())
         return unique_events
-# Initialisation du calculateur
+# Initialisation du calculateur à l'import : l'éphéméride est ouverte dans le
+# processus parent, avant tout fork de workers
 astro_calculator = AstroCalculator()
 
+def get_calculator() -> AstroCalculator:
+    """Instance partagée du calculateur (à utiliser plutôt qu'un nouvel AstroCalculator)"""
+    return astro_calculator
+
+def _orjson_tool_serializer(data: Any) -> str:
+    """Sérialise les réponses des tools avec orjson (dataclasses et numpy natifs)"""
+    if isinstance(data, str):
+        return data
+    return orjson.dumps(
+        data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+# Nombre maximal de dates distinctes par appel de get_planetary_positions_batch (une année)
+MAX_BATCH_DATES = 366
+
 # Serveur FastMCP
 if FASTMCP_AVAILABLE:
-    mcp = FastMCP("AstroChart Calculator")
+    if ORJSON_AVAILABLE:
+        try:
+            mcp = FastMCP("AstroChart Calculator", tool_serializer=_orjson_tool_serializer)
+        except TypeError:
+            # Version de FastMCP sans sérialiseur configurable
+            mcp = FastMCP("AstroChart Calculator")
+    else:
+        mcp = FastMCP("AstroChart Calculator")
 
     @mcp.tool()
-    def get_planetary_positions(date: str = None) -> dict:
+    async def get_planetary_positions(date: str = None) -> dict:
         """
         Calcule les positions planétaires pour une date donnée.
         
@@ -264,12 +440,12 @@ if FASTMCP_AVAILABLE:
             else:
                 target_date = datetime.date.today()
             
-            positions = astro_calculator.calculate_positions(target_date)
+            positions, _, _ = await asyncio.to_thread(astro_calculator.get_chart, target_date)
             
             return {
                 "success": True,
-                "date": target_date.strftime('%Y-%m-%d'),
-                "positions": [asdict(pos) for pos in positions],
+                "date": target_date.isoformat(),
+                "positions": [pos.to_dict() for pos in positions],
                 "total_planets": len(positions)
             }
             
@@ -277,7 +453,41 @@ if FASTMCP_AVAILABLE:
             return {"success": False, "error": str(e)}
 
     @mcp.tool()
-    def get_planetary_aspects(date: str = None) -> dict:
+    async def get_planetary_positions_batch(dates: List[str]) -> dict:
+        """
+        Calcule les positions planétaires pour plusieurs dates en un seul appel.
+        
+        Args:
+            dates: Liste de dates au format YYYY-MM-DD (doublons ignorés, au plus MAX_BATCH_DATES dates distinctes)
+        
+        Returns:
+            Positions de toutes les planètes, regroupées par date
+        """
+        try:
+            # Dédoublonnage en conservant l'ordre : chaque date n'est calculée qu'une fois
+            target_dates = list(dict.fromkeys(datetime.datetime.strptime(d, '%Y-%m-%d').date() for d in dates))
+            if len(target_dates) > MAX_BATCH_DATES:
+                return {
+                    "success": False,
+                    "error": f"Trop de dates ({len(target_dates)}), maximum {MAX_BATCH_DATES} par appel"
+                }
+            
+            batch = await asyncio.to_thread(astro_calculator.calculate_positions_batch, target_dates)
+            
+            return {
+                "success": True,
+                "positions": {
+                    target_date.isoformat(): [pos.to_dict() for pos in positions]
+                    for target_date, positions in zip(target_dates, batch)
+                },
+                "total_dates": len(target_dates)
+            }
+            
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    @mcp.tool()
+    async def get_planetary_aspects(date: str = None) -> dict:
         """
         Calcule les aspects planétaires pour une date donnée.
         
@@ -293,13 +503,12 @@ if FASTMCP_AVAILABLE:
             else:
                 target_date = datetime.date.today()
             
-            positions = astro_calculator.calculate_positions(target_date)
-            aspects = astro_calculator.calculate_aspects(positions)
+            _, aspects, _ = await asyncio.to_thread(astro_calculator.get_chart, target_date)
             
             return {
                 "success": True,
-                "date": target_date.strftime('%Y-%m-%d'),
-                "aspects": [asdict(aspect) for aspect in aspects],
+                "date": target_date.isoformat(),
+                "aspects": [aspect.to_dict() for aspect in aspects],
                 "total_aspects": len(aspects)
             }
             
@@ -307,7 +516,7 @@ if FASTMCP_AVAILABLE:
             return {"success": False, "error": str(e)}
 
     @mcp.tool()
-    def get_complete_chart_data(date: str = None) -> dict:
+    async def get_complete_chart_data(date: str = None) -> dict:
         """
         Génère toutes les données d'une carte astrologique complète.
         
@@ -323,11 +532,11 @@ if FASTMCP_AVAILABLE:
             else:
                 target_date = datetime.date.today()
             
-            chart_data = astro_calculator.generate_chart_data(target_date)
+            chart_data = await asyncio.to_thread(astro_calculator.generate_chart_data, target_date)
             
             return {
                 "success": True,
-                "chart_data": asdict(chart_data)
+                "chart_data": chart_data.to_dict()
             }
             
         except Exception as e:
@@ -347,7 +556,7 @@ if FASTMCP_AVAILABLE:
                 "skyfield_loaded": True,
                 "ephemeris_file": "de440s.bsp",
                 "supported_planets": list(astro_calculator.planet_codes.keys()),
-                "supported_aspects": ["conjunction", "opposition", "trine", "square", "sextile"],
+                "supported_aspects": list(astro_calculator._aspect_names),
                 "calculation_precision": "astronomical",
                 "zodiac_system": "tropical"
             }
@@ -391,6 +600,7 @@ if __name__ == "__main__":
     print("=" * 40)
     
     if FASTMCP_AVAILABLE:
+        astro_calculator.warm_up()
         print("🚀 Démarrage serveur MCP...")
         mcp.run()
     else:
@@ -399,7 +609,24 @@ if __name__ == "__main__":
         # Test en mode direct
         print("🧪 Test en mode direct...")
         today = datetime.date.today()
+
+        def emit_timing(op: str, n: int, start_ns: int):
+            """Une ligne JSON par mesure, exploitable en CI pour repérer les régressions"""
+            json.dump({"op": op, "n": n, "ns": time.perf_counter_ns() - start_ns}, sys.stdout)
+            sys.stdout.write("\n")
+
+        start_ns = time.perf_counter_ns()
         chart_data = astro_calculator.generate_chart_data(today)
+        emit_timing("generate_chart_data", len(chart_data.planets), start_ns)
+
+        start_ns = time.perf_counter_ns()
+        chart_data = astro_calculator.generate_chart_data(today)
+        emit_timing("generate_chart_data_cached", len(chart_data.planets), start_ns)
+
+        month = [today + datetime.timedelta(days=offset) for offset in range(30)]
+        start_ns = time.perf_counter_ns()
+        astro_calculator.calculate_positions_batch(month)
+        emit_timing("calculate_positions_batch", len(month), start_ns)
         
         print(f"\n📊 Carte pour {today}:")
         print(f"Signe solaire: {chart_data.sun_sign}")
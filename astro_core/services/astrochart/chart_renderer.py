@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Rendu matplotlib des cartes astrales
+Module sans effet de bord à l'import : c'est le seul que chargent les processus de rendu
+(ni éphéméride, ni générateurs, ni serveur MCP)
+"""
+
+import atexit
+import datetime
+import math
+import multiprocessing
+import sys
+import threading
+import types
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Style de la carte
+CHART_IMAGE_SIZE = (6, 6)
+CHART_BACKGROUND_COLOR = "#0c0e1c"
+CHART_TEXT_COLOR = "#e6e6fa"
+CHART_IMAGE_DPI = 200
+ZODIAC_SYMBOLS = ['♈', '♉', '♊', '♋', '♌', '♍', '♎', '♏', '♐', '♑', '♒', '♓']
+
+# Rendu matplotlib hors du processus principal (Agg n'est pas fiable entre threads)
+CHART_RENDER_WORKERS = 2
+
+# Figure réutilisée d'une date à l'autre (créée au premier rendu, une par processus)
+_chart_figure = None
+_chart_lock = threading.Lock()
+_chart_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_chart_figure():
+    """Construit une seule fois la figure et ses éléments fixes (roue zodiacale, axes)"""
+    global _chart_figure
+    if _chart_figure is None:
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=CHART_IMAGE_SIZE)
+        ax = fig.add_subplot(projection='polar')
+        ax.set_facecolor(CHART_BACKGROUND_COLOR)
+        fig.patch.set_facecolor(CHART_BACKGROUND_COLOR)
+
+        for i in range(12):
+            angle = math.radians(i * 30)
+            ax.plot([angle, angle], [0.6, 1.1], color=CHART_TEXT_COLOR, alpha=0.5, linewidth=1)
+            sign_angle = math.radians(i * 30 + 15)
+            ax.text(sign_angle, 1.05, ZODIAC_SYMBOLS[i], ha='center', va='center', fontsize=20, color=CHART_TEXT_COLOR, weight='bold')
+
+        ax.set_theta_zero_location('N')
+        ax.set_theta_direction(1)
+
+        ax.set_ylim(0, 1.2)
+        ax.set_rticks([])
+        ax.set_thetagrids([])
+        ax.grid(False)
+
+        _chart_figure = (fig, ax)
+    return _chart_figure
+
+
+def render_chart(chart_data: List[Dict], date: datetime.date, output_path) -> str:
+    """Dessine les données préparées par AstroChartImageGenerator.create_chart_data et sauvegarde l'image"""
+    # La figure est partagée : un seul rendu à la fois
+    with _chart_lock:
+        fig, ax = _get_chart_figure()
+        dynamic_artists = []
+        try:
+            for planet in chart_data:
+                angle = planet['angle']
+                dynamic_artists.append(ax.scatter(angle, 0.85, s=300, c=planet['color'], edgecolors='white', linewidth=2, zorder=10))
+                dynamic_artists.append(ax.text(angle, 0.85, planet['symbol'], ha='center', va='center', fontsize=16, color='black', weight='bold', zorder=11))
+                dynamic_artists.append(ax.text(angle, 0.75, f"{planet['degree_in_sign']:.0f}°", ha='center', va='center', fontsize=8, color='white'))
+
+            ax.set_title(f"skyfield(de440s) - {date.strftime('%d/%m/%Y')}", fontsize=8, color=CHART_TEXT_COLOR, pad=30, weight='bold')
+            legend_text = [
+                f"{planet['symbol']} {planet['name'].title()}: {planet['sign_name']} {planet['degree_in_sign']:.1f}°"
+                for planet in chart_data
+            ]
+
+            dynamic_artists.append(fig.text(0.98, 0.98, '\n'.join(legend_text),
+                    fontsize=6,
+                    color='white',
+                    ha='right',
+                    va='top',
+                    fontfamily='monospace',
+                    bbox=dict(boxstyle="round,pad=0.4", facecolor='black', alpha=0.8)))
+
+            fig.savefig(output_path, facecolor=CHART_BACKGROUND_COLOR, dpi=CHART_IMAGE_DPI, bbox_inches='tight')
+        finally:
+            # Retirer les éléments propres à cette date avant le prochain rendu
+            for artist in dynamic_artists:
+                artist.remove()
+
+    return str(output_path)
+
+
+# =============================================================================
+# PROCESSUS DE RENDU
+# =============================================================================
+
+def _init_chart_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+@contextmanager
+def _main_script_hidden():
+    """"spawn" ré-exécute le script principal (main.py, astro_mcp.py) dans chaque worker :
+    on le masque le temps de démarrer les processus"""
+    main_module = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main_module
+
+
+def _get_chart_pool() -> ProcessPoolExecutor:
+    global _chart_pool
+    if _chart_pool is None:
+        # "spawn" : les workers ne héritent ni des threads (TTS, lecteurs) ni des verrous du processus serveur
+        _chart_pool = ProcessPoolExecutor(max_workers=CHART_RENDER_WORKERS, initializer=_init_chart_worker,
+                                          mp_context=multiprocessing.get_context("spawn"))
+        atexit.register(shutdown_chart_pool)
+    return _chart_pool
+
+
+def submit_chart_render(chart_data: List[Dict], date: datetime.date, output_path: str) -> Future:
+    """Soumet un rendu aux processus dédiés (seules des données simples traversent la frontière)"""
+    pool = _get_chart_pool()
+    # Les workers sont démarrés à la demande pendant submit()
+    with _main_script_hidden():
+        return pool.submit(render_chart, chart_data, date, output_path)
+
+
+def shutdown_chart_pool() -> None:
+    """Arrête les processus de rendu des cartes (à l'arrêt de l'application)"""
+    global _chart_pool
+    if _chart_pool is not None:
+        _chart_pool.shutdown(wait=False, cancel_futures=True)
+        _chart_pool = None
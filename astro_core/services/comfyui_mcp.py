@@ -9,25 +9,62 @@ import datetime
 import logging
 import json
 import os
+import queue
 import random
+import re
+import sys
+import threading
 import time
-from typing import Dict, List, Optional, Union, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple, Union, Any
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
 import asyncio
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import websocket
 import uuid
 from fastmcp import FastMCP
 from config import settings
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+def _json_dumps_bytes(obj: Any) -> bytes:
+    """Sérialise en JSON (bytes UTF-8), via orjson si disponible"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _copy_payload(value: Any) -> Any:
+    """Copie les dicts et listes d'une réponse figée : l'appelant peut la modifier sans altérer le cache"""
+    if isinstance(value, dict):
+        return {key: _copy_payload(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_payload(item) for item in value]
+    return value
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Réglages ControlNet : les signes aux formes complexes gardent le contrôle plus longtemps
+_COMPLEX_SIGNS = frozenset({"gemini", "scorpio", "capricorn", "aquarius", "pisces"})
+_CN_COMPLEX = MappingProxyType({"strength": 0.2, "start_percent": 0.0, "end_percent": 0.5})
+_CN_SIMPLE = MappingProxyType({"strength": 0.2, "start_percent": 0.0, "end_percent": 0.43})
+
+@dataclass(slots=True)
 class VideoSpecs:
     """Spécifications vidéo pour différents formats"""
     width: int
@@ -38,7 +75,18 @@ class VideoSpecs:
     platform: str
     batch_size: int
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'width': self.width,
+            'height': self.height,
+            'fps': self.fps,
+            'duration': self.duration,
+            'aspect_ratio': self.aspect_ratio,
+            'platform': self.platform,
+            'batch_size': self.batch_size
+        }
+
+@dataclass(slots=True)
 class ConstellationVideoResult:
     """Résultat de génération de vidéo constellation"""
     sign: str
@@ -50,6 +98,18 @@ class ConstellationVideoResult:
     file_size: int
     duration_seconds: float
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'sign': self.sign,
+            'sign_name': self.sign_name,
+            'video_path': self.video_path,
+            'prompt_used': self.prompt_used,
+            'specs': self.specs.to_dict(),
+            'generation_timestamp': self.generation_timestamp,
+            'file_size': self.file_size,
+            'duration_seconds': self.duration_seconds
+        }
+
 # =============================================================================
 # CLASS ComfyUIVideoGenerator
 # =============================================================================
@@ -57,12 +117,34 @@ class ConstellationVideoResult:
 class ComfyUIVideoGenerator:
     """Générateur de vidéos via ComfyUI"""
     
+    COMFYUI_OUTPUT_DIR = "/home/fluxart/ComfyUI/output"
+    
     def __init__(self, comfyui_server: str = "127.0.0.1:8188", output_dir: str = "generated_videos", images_dir: str = "images"):
         self.server_address = comfyui_server
         self.client_id = str(uuid.uuid4())
         self.output_dir = settings.GENERATED_VIDEOS_DIR
         self.images_dir = settings.INPUT_IMAGES_DIR
         self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Session HTTP persistante : connexions keep-alive réutilisées pour toutes les requêtes ComfyUI
+        self._http = requests.Session()
+        # Pool dimensionné pour le batch : file d'attente, historique et finalisations en parallèle
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                              max_retries=Retry(total=2, backoff_factor=0.1))
+        self._http.mount("http://", adapter)
+
+        # Garde-fous WebSocket : ComfyUI peut cesser d'émettre sans prévenir
+        self.ws_recv_timeout = 30.0     # secondes sans message avant de consulter l'historique
+
+        # Sorties vidéo annoncées par les événements WebSocket 'executed' (prompt_id -> gifs)
+        self._ws_outputs: Dict[str, List[Dict[str, Any]]] = {}
+        # Tailles relevées lors de la recherche des vidéos (chemin -> octets), pour ne pas re-stat
+        self._video_sizes: Dict[str, int] = {}
+
+        # Index des images de référence présentes (un seul scandir au lieu d'un stat par signe)
+        self._known_images: Dict[str, os.stat_result] = {}
+        self._images_mtime: Optional[int] = None
+        self.refresh_images()
         
         # Workflow de base avec ControlNet
         self.base_workflow = {
@@ -221,6 +303,19 @@ class ComfyUIVideoGenerator:
                 }
             }
         }
+        # Vérifier la validité du workflow (une seule fois : prepare_workflow ne fait que modifier des inputs)
+        for node_id, node in self.base_workflow.items():
+            if "class_type" not in node:
+                logger.error(f"❌ Nœud {node_id} manque class_type")
+                raise ValueError(f"Nœud {node_id} manque class_type")
+            if "inputs" not in node:
+                logger.error(f"❌ Nœud {node_id} manque inputs")
+                raise ValueError(f"Nœud {node_id} manque inputs")
+
+        # Gabarit JSON pré-sérialisé : seules les valeurs variables y sont injectées à chaque vidéo
+        # Deux variantes : Canny calculé (et sauvegardé pour la suite) ou carte de contours déjà en cache
+        self._workflow_template_json = self._build_workflow_template(cached_edges=False)
+        self._workflow_template_cached_edges_json = self._build_workflow_template(cached_edges=True)
         
         # Formats vidéo disponibles
         self.video_formats = {
@@ -383,6 +478,39 @@ class ComfyUIVideoGenerator:
                 "symbols": "ocean symbols"
             }
         }
+        # Métadonnées figées : vues en lecture seule, chaînes internées (valeurs très répétées)
+        self.sign_metadata = {
+            sign: MappingProxyType({
+                key: sys.intern(value) if isinstance(value, str)
+                else tuple(sys.intern(item) for item in value) if isinstance(value, list)
+                else value
+                for key, value in data.items()
+            })
+            for sign, data in self.sign_metadata.items()
+        }
+
+        # Prompts de constellation figés (métadonnées immuables) : calculés une seule fois
+        self._prompt_cache: Dict[str, str] = {
+            sign: self._build_prompt(sign) for sign in self.sign_metadata
+        }
+
+        # Clés figées : validation par hachage et listes de réponse sans réallocation
+        self._signs_frozen = frozenset(self.sign_metadata)
+        self._signs_tuple = tuple(self.sign_metadata)
+        self._formats_frozen = frozenset(self.video_formats)
+        self._formats_tuple = tuple(self.video_formats)
+
+        # Réponses des outils de configuration, figées une fois pour toutes
+        self._formats_payload = {
+            "success": True,
+            "formats": {name: specs.to_dict() for name, specs in self.video_formats.items()},
+            "count": len(self.video_formats)
+        }
+        self._correspondences_payload = {
+            "success": True,
+            "correspondences": _copy_payload({sign: dict(data) for sign, data in self.sign_metadata.items()}),
+            "total_signs": len(self.sign_metadata)
+        }
     
 # =============================================================================
 # FONCTIONS UTILITAIRES
@@ -392,14 +520,47 @@ class ComfyUIVideoGenerator:
         """Construit l'URL pour l'API ComfyUI"""
         return f"http://{self.server_address}/{endpoint}"
     
-    def _get_ws_url(self) -> str:
+    def close(self) -> None:
+        """Ferme la session HTTP et ses connexions keep-alive"""
+        self._http.close()
+
+    def refresh_images(self) -> None:
+        """Réindexe les images de référence présentes dans images_dir ({nom: stat})"""
+        try:
+            self._images_mtime = os.stat(self.images_dir).st_mtime_ns
+            with os.scandir(self.images_dir) as entries:
+                self._known_images = {entry.name: entry.stat() for entry in entries if entry.is_file()}
+        except OSError as e:
+            logger.warning(f"⚠️  Dossier images illisible ({self.images_dir}): {e}")
+            self._images_mtime = None
+            self._known_images = {}
+
+    def images_index(self) -> Dict[str, os.stat_result]:
+        """Index {nom: stat} de images_dir, rescanné seulement si le mtime du dossier a changé"""
+        try:
+            mtime = os.stat(self.images_dir).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is None or mtime != self._images_mtime:
+            self.refresh_images()
+        return self._known_images
+
+    def has_reference_image(self, sign: str) -> bool:
+        """Indique si l'image de référence du signe est présente (réindexe une fois en cas d'absence)"""
+        image_filename = f"{sign}_image.jpg"
+        if image_filename in self._known_images:
+            return True
+        self.refresh_images()
+        return image_filename in self._known_images
+
+    def _get_ws_url(self, client_id: Optional[str] = None) -> str:
         """Construit l'URL WebSocket pour ComfyUI"""
-        return f"ws://{self.server_address}/ws?clientId={self.client_id}"
+        return f"ws://{self.server_address}/ws?clientId={client_id or self.client_id}"
     
     def test_connection(self) -> bool:
         """Teste la connexion à ComfyUI"""
         try:
-            response = requests.get(self._get_url("system_stats"), timeout=5)
+            response = self._http.get(self._get_url("system_stats"), timeout=5)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Erreur connexion ComfyUI: {e}")
@@ -409,10 +570,11 @@ class ComfyUIVideoGenerator:
         """Crée le prompt optimisé pour chaque constellation"""
         if custom_prompt:
             return custom_prompt
-        
-        sign_data = self.sign_metadata.get(sign, {})
-        if not sign_data:
-            return self._get_generic_prompt(sign)
+        return self._prompt_cache.get(sign) or self._get_generic_prompt(sign)
+
+    def _build_prompt(self, sign: str) -> str:
+        """Construit le prompt programmé d'un signe à partir de ses métadonnées"""
+        sign_data = self.sign_metadata[sign]
         
         color_primary = sign_data["colors"][0]
         color_secondary = sign_data["colors"][1] if len(sign_data["colors"]) > 1 else sign_data["colors"][0]
@@ -440,91 +602,193 @@ class ComfyUIVideoGenerator:
 \"8\": \"cosmic starry sky, constellation pattern forming, stars connecting with luminous lines, masterpiece, high quality\",
 \"16\": \"complete {sign} constellation, brilliant stars forming mythological shape, cosmic art, ornate tarot frame, masterpiece, high quality\"'''
     
-    def prepare_workflow(self, sign: str, format_name: str = "test", 
-                        custom_prompt: str = None, seed: int = None) -> Dict[str, Any]:
-        """Prépare le workflow avec l'image de référence correspondante"""
-        import copy
-        workflow = copy.deepcopy(self.base_workflow)
+    # Valeurs variables du workflow, injectées dans le gabarit JSON via des sentinelles
+    _TEMPLATE_FIELDS = {
+        "WIDTH": ("5", "width"),
+        "HEIGHT": ("5", "height"),
+        "BATCH_SIZE": ("5", "batch_size"),
+        "SEED": ("6", "seed"),
+        "FRAME_RATE": ("22", "frame_rate"),
+        "FILENAME_PREFIX": ("22", "filename_prefix"),
+        "IMAGE": ("27", "image"),
+        "PROMPTS": ("18", "prompts"),
+        "STRENGTH": ("26", "strength"),
+        "START_PERCENT": ("26", "start_percent"),
+        "END_PERCENT": ("26", "end_percent"),
+    }
+    _TEMPLATE_SENTINEL = re.compile(r'"__([A-Z_]+)__"')
+
+    # Nœud SaveImage ajouté pour récupérer la carte de contours Canny lors de la première génération
+    CANNY_SAVE_NODE = "34"
+
+    def _build_workflow_template(self, cached_edges: bool = False) -> str:
+        """Sérialise une fois le workflow avec ses paramètres fixes et des sentinelles pour les valeurs variables"""
+        workflow = json.loads(json.dumps(self.base_workflow))
+
+        if cached_edges:
+            # La carte de contours (mêmes seuils, même image) est chargée directement : plus de nœud Canny
+            del workflow["32"]
+            workflow["26"]["inputs"]["image"] = ["27", 0]
+        else:
+            workflow[self.CANNY_SAVE_NODE] = {
+                "inputs": {
+                    "filename_prefix": "__CANNY_PREFIX__",
+                    "images": ["32", 0]
+                },
+                "class_type": "SaveImage",
+                "_meta": {
+                    "title": "Save Canny Edges"
+                }
+            }
+        
+        # Parametres KSampler
+        workflow["6"]["inputs"]["steps"] = 25
+        workflow["6"]["inputs"]["cfg"] = 8.0
+        workflow["6"]["inputs"]["sampler_name"] = "dpmpp_2m"
+        workflow["6"]["inputs"]["scheduler"] = "karras"   
+
+        # Negative Prompt
+        workflow["16"]["inputs"]["text"] = """blurry, low quality, human, duplicate, abrupt transition, sudden change, 
+        discontinuous animation, jerky movement, static image, frozen frame, harsh cuts, 
+        disconnected elements, scattered random dots, chaotic unconnected lines, 
+        unclear nebula formation, incomplete transformation, text, watermark, signature"""
+
+        for field, (node_id, input_name) in self._TEMPLATE_FIELDS.items():
+            workflow[node_id]["inputs"][input_name] = f"__{field}__"
         
+        return json.dumps(workflow)
+
+    def prepare_workflow_json(self, sign: str, format_name: str = "test", 
+                              custom_prompt: str = None, seed: int = None,
+                              timestamp: Optional[str] = None) -> str:
+        """Prépare le workflow sérialisé en injectant les valeurs variables dans le gabarit JSON"""
         # Récupérer les spécifications du format
         specs = self.video_formats.get(format_name, self.video_formats["test"])
-        
-        # Configurer les dimensions
-        workflow["5"]["inputs"]["width"] = specs.width
-        workflow["5"]["inputs"]["height"] = specs.height
-        workflow["5"]["inputs"]["batch_size"] = specs.batch_size
-        
 
         best_seed =["886110862547056", "835635557728234", "86142623141374", "447541316895164"]
         # Configurer le seed
         if seed is None:
             #seed = 447541316895164
             seed = random.randint(0, 2**31-1)
-        workflow["6"]["inputs"]["seed"] = seed
-        
-        # Configurer le frame rate
-        workflow["22"]["inputs"]["frame_rate"] = specs.fps
-        
-        # Configurer le nom de fichier
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        workflow["22"]["inputs"]["filename_prefix"] = f"{sign}_{format_name}_{timestamp}"
         
         # Configurer l'image de référence
         image_filename = f"{sign}_image.jpg"
-        workflow["27"]["inputs"]["image"] = image_filename
         
         # Vérifier que l'image existe
-        image_path = self.images_dir / image_filename
-        if not image_path.exists():
-            logger.warning(f"⚠️  Image de référence non trouvée: {image_path}")
+        if not self.has_reference_image(sign):
+            logger.warning(f"⚠️  Image de référence non trouvée: {self.images_dir / image_filename}")
 
+        # Carte de contours Canny déjà calculée pour cette image de référence : on saute le prétraitement
+        canny_filename = self._canny_filename(sign)
+        edges_cached = canny_filename is not None and canny_filename in self._known_images
+        if edges_cached:
+            image_filename = canny_filename
         
-        # Parametres KSampler
-        workflow["6"]["inputs"]["steps"] = 25
-        workflow["6"]["inputs"]["cfg"] = 8.0
-        workflow["6"]["inputs"]["sampler_name"] = "dpmpp_2m"
-        workflow["6"]["inputs"]["scheduler"] = "karras"   
+        # Ajuster la force du ControlNet selon le signe (certains nécessitent plus de contrôle)
+        controlnet = _CN_COMPLEX if sign in _COMPLEX_SIGNS else _CN_SIMPLE
 
-        # Configurer le prompt
-        constellation_prompt = self.create_constellation_prompt(sign, custom_prompt)
-        workflow["18"]["inputs"]["prompts"] = constellation_prompt
+        if timestamp is None:
+            timestamp = self._generation_timestamp()
+        values = {
+            "WIDTH": specs.width,
+            "HEIGHT": specs.height,
+            "BATCH_SIZE": specs.batch_size,
+            "SEED": seed,
+            "FRAME_RATE": specs.fps,
+            "FILENAME_PREFIX": f"{sign}_{format_name}_{timestamp}",
+            "IMAGE": image_filename,
+            "PROMPTS": self.create_constellation_prompt(sign, custom_prompt),
+            "STRENGTH": controlnet["strength"],
+            "START_PERCENT": controlnet["start_percent"],
+            "END_PERCENT": controlnet["end_percent"],
+            "CANNY_PREFIX": f"{sign}_canny",
+        }
+        template = self._workflow_template_cached_edges_json if edges_cached else self._workflow_template_json
         
-        # Ajuster la force du ControlNet selon le signe (certains nécessitent plus de contrôle)
-        complex_signs = ["gemini", "scorpio", "capricorn", "aquarius", "pisces"]
-        if sign in complex_signs:
-            workflow["26"]["inputs"]["strength"] = 0.2
-            workflow["26"]["inputs"]["start_percent"] = 0.0
-            workflow["26"]["inputs"]["end_percent"] = 0.5
-        else:
-            workflow["26"]["inputs"]["strength"] = 0.2
-            workflow["26"]["inputs"]["start_percent"] = 0.0
-            workflow["26"]["inputs"]["end_percent"] = 0.43
+        # Substitution en une passe : une valeur ne peut pas être réinterprétée comme sentinelle
+        return self._TEMPLATE_SENTINEL.sub(
+            lambda match: json.dumps(values[match.group(1)]),
+            template
+        )
 
-        # Negative Prompt
-        workflow["16"]["inputs"]["text"] = """blurry, low quality, human, duplicate, abrupt transition, sudden change, 
-        discontinuous animation, jerky movement, static image, frozen frame, harsh cuts, 
-        disconnected elements, scattered random dots, chaotic unconnected lines, 
-        unclear nebula formation, incomplete transformation, text, watermark, signature"""
+    def _canny_filename(self, sign: str) -> Optional[str]:
+        """
+        Nom de la carte de contours Canny du signe, indexé sur la taille et le mtime de l'image de référence :
+        une image remplacée donne un autre nom, donc un cache manquant plutôt que des contours périmés.
+        """
+        try:
+            reference = os.stat(self.images_dir / f"{sign}_image.jpg")
+        except OSError:
+            return None
+        return f"{sign}_canny_{reference.st_size:x}_{reference.st_mtime_ns:x}.png"
 
-        # Vérifier la validité du workflow
-        for node_id, node in workflow.items():
-            if "class_type" not in node:
-                logger.error(f"❌ Nœud {node_id} manque class_type")
-                raise ValueError(f"Nœud {node_id} manque class_type")
-            if "inputs" not in node:
-                logger.error(f"❌ Nœud {node_id} manque inputs")
-                raise ValueError(f"Nœud {node_id} manque inputs")
-        
-        return workflow
+    def has_canny_edges(self, sign: str) -> bool:
+        """Indique si la carte de contours Canny de l'image de référence actuelle est en cache dans images_dir"""
+        canny_filename = self._canny_filename(sign)
+        return canny_filename is not None and canny_filename in self._known_images
+
+    def _cache_canny_edges(self, sign: str, prompt_id: str) -> None:
+        """Copie la carte de contours sauvegardée par ComfyUI dans images_dir pour les générations suivantes"""
+        try:
+            canny_filename = self._canny_filename(sign)
+            if canny_filename is None:
+                return
+            response = self._http.get(self._get_url(f"history/{prompt_id}"), timeout=10)
+            response.raise_for_status()
+            outputs = response.json().get(prompt_id, {}).get("outputs", {})
+            images = outputs.get(self.CANNY_SAVE_NODE, {}).get("images", [])
+            if not images:
+                return
+            
+            source = os.path.join(self.COMFYUI_OUTPUT_DIR, images[0].get("subfolder", ""), images[0]["filename"])
+            destination = self.images_dir / canny_filename
+            # Écriture atomique : ComfyUI ne peut jamais charger une carte à moitié copiée
+            temporary = destination.with_name(f".{canny_filename}.tmp")
+            shutil.copy2(source, temporary)
+            os.replace(temporary, destination)
+            self._known_images[canny_filename] = os.stat(destination)
+            
+            # Les cartes calculées pour une ancienne version de l'image de référence sont supprimées
+            for name in [n for n in self._known_images if n.startswith(f"{sign}_canny") and n != canny_filename]:
+                try:
+                    os.remove(self.images_dir / name)
+                except OSError:
+                    pass
+                self._known_images.pop(name, None)
+            logger.info(f"🗂️  Contours Canny mis en cache pour {sign}")
+        except Exception as e:
+            logger.warning(f"⚠️  Mise en cache des contours Canny impossible pour {sign}: {e}")
+
+    def prepare_workflow(self, sign: str, format_name: str = "test", 
+                        custom_prompt: str = None, seed: int = None,
+                        timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Prépare le workflow avec l'image de référence correspondante"""
+        return _json_loads(self.prepare_workflow_json(sign, format_name, custom_prompt, seed, timestamp))
+
+    @staticmethod
+    def _generation_timestamp() -> str:
+        """Horodatage commun au préfixe ComfyUI et au nom du fichier final d'une génération"""
+        return datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
     
-    def queue_prompt(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
-        """Met en file d'attente un workflow"""
-        payload = {"prompt": workflow, "client_id": self.client_id}
-        
+    def queue_prompt(self, workflow: Union[Dict[str, Any], str], client_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Met en file d'attente un workflow (dict, ou JSON déjà sérialisé par prepare_workflow_json).
+        `client_id` : identifiant de la WebSocket qui suivra ce prompt (ComfyUI n'envoie ses événements qu'à elle).
+        """
+        client_id = client_id or self.client_id
         try:
-            logger.info(f"🔍 Envoi du workflow avec {len(workflow)} nœuds")
+            if isinstance(workflow, str):
+                # Payload assemblé par concaténation : pas de re-sérialisation du workflow
+                logger.info(f"🔍 Envoi du workflow sérialisé ({len(workflow)} octets)")
+                body = ('{"prompt": ' + workflow + ', "client_id": ' + json.dumps(client_id) + '}').encode("utf-8")
+            else:
+                logger.info(f"🔍 Envoi du workflow avec {len(workflow)} nœuds")
+                body = _json_dumps_bytes({"prompt": workflow, "client_id": client_id})
             
-            response = requests.post(self._get_url("prompt"), json=payload, timeout=30)
+            response = self._http.post(
+                self._get_url("prompt"), data=body,
+                headers={"Content-Type": "application/json"}, timeout=30
+            )
             
             if response.status_code != 200:
                 logger.error(f"❌ Erreur HTTP {response.status_code}: {response.text}")
@@ -536,20 +800,111 @@ class ComfyUIVideoGenerator:
             logger.error(f"Erreur lors de la mise en file d'attente: {e}")
             raise
     
-    def wait_for_completion(self, prompt_id: str) -> bool:
-        """Attend la fin de la génération via WebSocket avec barre de progression"""
-        pbar = None
+    def _record_executed(self, data: Dict[str, Any]) -> None:
+        """Mémorise les fichiers vidéo annoncés par un événement 'executed' (nœud VHS_VideoCombine)"""
+        execution_data = data.get('data', {})
+        gifs = (execution_data.get('output') or {}).get('gifs')
+        if gifs:
+            self._ws_outputs[execution_data.get('prompt_id')] = gifs
+
+    def _prompt_status(self, prompt_id: str) -> Dict[str, Any]:
+        """Statut d'un prompt dans l'historique ComfyUI ({} si absent ou injoignable)"""
+        try:
+            response = self._http.get(self._get_url(f"history/{prompt_id}"), timeout=10)
+            response.raise_for_status()
+            return response.json().get(prompt_id, {}).get('status', {}) or {}
+        except Exception as e:
+            logger.warning(f"⚠️ Consultation de l'historique impossible: {e}")
+            return {}
+
+    def _start_ws_reader(self, ws: websocket.WebSocket) -> queue.Queue:
+        """
+        Vide la WebSocket dans un thread dédié : le tampon socket est lu au rythme de ComfyUI,
+        indépendamment du décodage et de la barre de progression côté consommateur.
+        Les trames texte sont déposées dans la file ; une exception de lecture y est déposée en dernier.
+        """
+        messages: queue.Queue = queue.Queue(maxsize=4096)
+
+        def reader() -> None:
+            while True:
+                try:
+                    message = ws.recv()
+                except Exception as e:
+                    try:
+                        messages.put_nowait(e)
+                    except queue.Full:
+                        pass
+                    return
+                # Les trames binaires sont des aperçus d'images : inutile de les transmettre
+                if not isinstance(message, str):
+                    continue
+                try:
+                    messages.put_nowait(message)
+                except queue.Full:
+                    logger.warning("⚠️ File WebSocket pleine, message ignoré")
+
+        threading.Thread(target=reader, name="comfyui-ws-reader", daemon=True).start()
+        return messages
+
+    def _open_ws(self, client_id: Optional[str] = None) -> Tuple[websocket.WebSocket, queue.Queue]:
+        """
+        Ouvre la WebSocket ComfyUI et démarre son thread de lecture.
+        Passer un client_id propre à la génération (et le même à queue_prompt) : deux générations
+        concurrentes sous le même identifiant se voleraient leurs événements.
+        """
         ws = websocket.WebSocket()
+        ws.connect(self._get_ws_url(client_id))
+        return ws, self._start_ws_reader(ws)
+
+    def wait_for_completion(self, prompt_id: str,
+                            connection: Optional[Tuple[websocket.WebSocket, queue.Queue]] = None) -> bool:
+        """
+        Attend la fin de la génération via WebSocket avec barre de progression.
+        `connection` : WebSocket ouverte (via _open_ws) avant la mise en file, pour ne manquer aucun événement ;
+        elle est fermée en fin d'attente.
+        """
+        pbar = None
+        ws = None
+        completed = False
 
         try:
-            ws.connect(self._get_ws_url())
+            ws, messages = connection if connection is not None else self._open_ws()
 
+            # Pas de délai global : un prompt peut attendre longtemps dans la file ComfyUI (lot en cours)
             while True:
-                message = ws.recv()
-                if isinstance(message, str):
-                    data = json.loads(message)
+                try:
+                    message = messages.get(timeout=self.ws_recv_timeout)
+                except queue.Empty:
+                    # Silence WebSocket : l'historique fait foi
+                    status = self._prompt_status(prompt_id)
+                    if status.get('status_str') == 'error':
+                        logger.error(f"❌ Génération échouée pour {prompt_id} (erreur signalée par l'historique)")
+                        return False
+                    if status.get('completed'):
+                        logger.info("✅ Génération terminée (via historique)")
+                        completed = True
+                        return True
+                    continue
+                if isinstance(message, Exception):
+                    raise message
+
+                # Parmi les trames texte, seules celles qui citent notre prompt_id
+                # et un type suivi méritent d'être décodées
+                if (prompt_id in message
+                        and ('"progress"' in message or '"executing"' in message or '"executed"' in message
+                             or '"execution_error"' in message or '"execution_interrupted"' in message)):
+                    data = _json_loads(message)
 
-                    if data.get('type') == 'progress' and data.get('data', {}).get('prompt_id') == prompt_id:
+                    if data.get('type') == 'executed':
+                        self._record_executed(data)
+
+                    elif data.get('type') in ('execution_error', 'execution_interrupted') \
+                            and data.get('data', {}).get('prompt_id') == prompt_id:
+                        logger.error(f"❌ Génération échouée pour {prompt_id}: "
+                                     f"{data['data'].get('exception_message', 'exécution interrompue')}")
+                        return False
+
+                    elif data.get('type') == 'progress' and data.get('data', {}).get('prompt_id') == prompt_id:
                         progress_data = data['data']
                         value = progress_data.get('value', 0)
                         max_val = progress_data.get('max', 1)
@@ -567,6 +922,7 @@ class ComfyUIVideoGenerator:
                                 pbar.n = pbar.total
                                 pbar.refresh()
                             logger.info("✅ Génération terminée")
+                            completed = True
                             return True
                         else:
                             node_id = execution_data.get('node')
@@ -577,15 +933,50 @@ class ComfyUIVideoGenerator:
             logger.error(f"Erreur WebSocket: {e}")
             return False
         finally:
+            if not completed:
+                # Pas de finalize_video pour ce prompt : sa sortie annoncée ne sera jamais consommée
+                self._ws_outputs.pop(prompt_id, None)
             if pbar:
                 pbar.close()
-            if ws.connected:
+            if ws is not None and ws.connected:
                 ws.close()
     
-    def find_generated_video(self, prompt_id: str) -> Optional[str]:
-        """Trouve la vidéo générée dans l'historique"""
+    def _mp4_from_gifs(self, gifs: List[Dict[str, Any]]) -> Optional[str]:
+        """Retourne le chemin du premier mp4 existant parmi les sorties 'gifs' (VideoHelperSuite)"""
+        comfyui_output = self.COMFYUI_OUTPUT_DIR
+        for file_info in gifs:
+            filename = file_info.get("filename", "")
+            if filename.endswith(".mp4"):
+                subfolder = file_info.get("subfolder", "")
+                
+                if subfolder:
+                    full_path = os.path.join(comfyui_output, subfolder, filename)
+                else:
+                    full_path = os.path.join(comfyui_output, filename)
+                
+                try:
+                    self._video_sizes[full_path] = os.stat(full_path).st_size
+                except OSError:
+                    continue
+                return full_path
+        return None
+
+    def find_generated_video(self, prompt_id: str, allow_recent_fallback: bool = True) -> Optional[str]:
+        """
+        Trouve la vidéo générée (événement WebSocket, sinon historique).
+        `allow_recent_fallback` : en dernier recours, prendre le mp4 le plus récent du dossier ComfyUI ;
+        à désactiver quand plusieurs prompts sont en cours (le fichier pourrait être celui d'un autre signe).
+        """
+        # Sortie déjà annoncée par l'événement 'executed' : pas d'aller-retour HTTP
+        gifs = self._ws_outputs.get(prompt_id)
+        if gifs:
+            full_path = self._mp4_from_gifs(gifs)
+            if full_path:
+                self._ws_outputs.pop(prompt_id, None)
+                return full_path
+
         try:
-            response = requests.get(self._get_url(f"history/{prompt_id}"))
+            response = self._http.get(self._get_url(f"history/{prompt_id}"), timeout=10)
             response.raise_for_status()
             history = response.json()
             
@@ -599,33 +990,29 @@ class ComfyUIVideoGenerator:
             for node_id, node_output in outputs.items():
                 # Chercher dans 'gifs' (VideoHelperSuite)
                 if "gifs" in node_output:
-                    for file_info in node_output["gifs"]:
-                        filename = file_info.get("filename", "")
-                        if filename.endswith(".mp4"):
-                            subfolder = file_info.get("subfolder", "")
-                            comfyui_output = "/home/fluxart/ComfyUI/output"
-                            
-                            if subfolder:
-                                full_path = os.path.join(comfyui_output, subfolder, filename)
-                            else:
-                                full_path = os.path.join(comfyui_output, filename)
-                            
-                            if os.path.exists(full_path):
-                                return full_path
+                    full_path = self._mp4_from_gifs(node_output["gifs"])
+                    if full_path:
+                        return full_path
+            
+            if not allow_recent_fallback:
+                return None
             
             # Recherche par pattern de nom de fichier
             logger.info(f"🔍 Recherche par pattern...")
-            comfyui_output = "/home/fluxart/ComfyUI/output"
-            
-            import glob
-            mp4_files = glob.glob(os.path.join(comfyui_output, "*.mp4"))
-            if mp4_files:
-                latest_mp4 = max(mp4_files, key=os.path.getctime)
-                file_time = os.path.getctime(latest_mp4)
-                current_time = time.time()
-                
-                if current_time - file_time < 300:  # 5 minutes
-                    return latest_mp4
+            comfyui_output = self.COMFYUI_OUTPUT_DIR
+            
+            # Un seul parcours du dossier, un seul stat par fichier
+            latest_mp4, latest_time, latest_size = None, 0.0, 0
+            with os.scandir(comfyui_output) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".mp4"):
+                        entry_stat = entry.stat()
+                        if entry_stat.st_ctime > latest_time:
+                            latest_mp4, latest_time, latest_size = entry.path, entry_stat.st_ctime, entry_stat.st_size
+            
+            if latest_mp4 and time.time() - latest_time < 300:  # 5 minutes
+                self._video_sizes[latest_mp4] = latest_size
+                return latest_mp4
             
             return None
             
@@ -643,50 +1030,96 @@ class ComfyUIVideoGenerator:
             logger.error("❌ Impossible de se connecter à ComfyUI")
             return None
         
-        # Vérifier que l'image de référence existe
-        image_path = self.images_dir / f"{sign}_image.jpg"
-        if not image_path.exists():
-            logger.error(f"❌ Image de référence manquante: {image_path}")
-            return None
-        
+        connection = None
+        # Identifiant propre à cette génération : sa WebSocket ne reçoit que ses propres événements
+        client_id = str(uuid.uuid4())
         try:
-            # Préparer le workflow
-            workflow = self.prepare_workflow(sign, format_name, custom_prompt, seed)
-            
-            # Mettre en file d'attente
-            response = self.queue_prompt(workflow)
-            prompt_id = response.get('prompt_id')
-            
-            if not prompt_id:
-                logger.error("❌ Pas de prompt_id reçu")
+            # WebSocket ouverte avant la mise en file : même une génération très courte est suivie
+            connection = self._open_ws(client_id)
+            job = self.submit_to_comfyui(sign, format_name, custom_prompt, seed, client_id)
+            if job is None:
                 return None
+            prompt_id, timestamp = job
             
-            logger.info(f"✅ Prompt en file d'attente: {prompt_id}")
-            
-            # Attendre la fin de la génération
-            if not self.wait_for_completion(prompt_id):
+            # Attendre la fin de la génération (wait_for_completion referme la WebSocket)
+            waiting, connection = connection, None
+            if not self.wait_for_completion(prompt_id, waiting):
                 logger.error("❌ Échec de la génération")
                 return None
             
-            # Attendre que les fichiers soient écrits
-            time.sleep(2)
+            return self.finalize_video(sign, format_name, prompt_id, timestamp, custom_prompt)
+            
+        except Exception as e:
+            logger.error(f"❌ Erreur génération vidéo: {e}")
+            return None
+        finally:
+            if connection is not None and connection[0].connected:
+                connection[0].close()
+
+    def submit_to_comfyui(self, sign: str, format_name: str = "test",
+                          custom_prompt: str = None, seed: int = None,
+                          client_id: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """Met en file d'attente la génération d'un signe ; retourne (prompt_id, horodatage) ou None"""
+        # Vérifier que l'image de référence existe
+        if not self.has_reference_image(sign):
+            logger.error(f"❌ Image de référence manquante: {self.images_dir / f'{sign}_image.jpg'}")
+            return None
+        
+        try:
+            # Préparer le workflow (un seul horodatage pour le préfixe ComfyUI et le fichier final)
+            timestamp = self._generation_timestamp()
+            workflow = self.prepare_workflow_json(sign, format_name, custom_prompt, seed, timestamp)
+            
+            # Mettre en file d'attente
+            prompt_id = self.queue_prompt(workflow, client_id).get('prompt_id')
+        except Exception as e:
+            logger.error(f"❌ Mise en file impossible pour {sign}: {e}")
+            return None
+        
+        if not prompt_id:
+            logger.error(f"❌ Pas de prompt_id reçu pour {sign}")
+            return None
+        
+        logger.info(f"✅ {sign} en file d'attente: {prompt_id}")
+        return prompt_id, timestamp
+
+    def finalize_video(self, sign: str, format_name: str, prompt_id: str, timestamp: str,
+                       custom_prompt: Optional[str] = None,
+                       allow_recent_fallback: bool = True) -> Optional[ConstellationVideoResult]:
+        """Récupère la vidéo d'un prompt terminé et la copie dans notre dossier de sortie"""
+        video_path = None
+        try:
+            # Trouver la vidéo générée, en laissant à ComfyUI jusqu'à ~2 s pour l'écrire
+            video_path = self.find_generated_video(prompt_id, allow_recent_fallback)
+            for delay in (0.05, 0.1, 0.2, 0.4, 0.8, 0.45):
+                if video_path:
+                    break
+                time.sleep(delay)
+                video_path = self.find_generated_video(prompt_id, allow_recent_fallback)
             
-            # Trouver la vidéo générée
-            video_path = self.find_generated_video(prompt_id)
+            if not self.has_canny_edges(sign):
+                self._cache_canny_edges(sign, prompt_id)
             
             if not video_path:
                 logger.error("❌ Vidéo générée non trouvée")
                 return None
             
-            # Copier vers notre dossier de sortie
+            # Lier (ou copier) vers notre dossier de sortie
             sign_data = self.sign_metadata.get(sign, {"name": sign.title()})
-            final_filename = f"{sign}_{format_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4"
+            final_filename = f"{sign}_{format_name}_{timestamp}.mp4"
             final_path = self.output_dir / final_filename
             
-            shutil.copy2(video_path, final_path)
+            # Taille déjà relevée lors de la recherche de la vidéo
+            file_size = self._video_sizes.pop(video_path, None)
             
-            # Obtenir les informations du fichier
-            file_size = os.path.getsize(final_path)
+            # Hardlink si même système de fichiers (aucun octet copié), sinon copie en comptant les octets
+            try:
+                os.link(video_path, final_path)
+            except OSError:
+                file_size = self._copy_file(video_path, final_path)
+            
+            if file_size is None:
+                file_size = os.path.getsize(final_path)
             specs = self.video_formats.get(format_name, self.video_formats["test"])
             duration_seconds = specs.batch_size / specs.fps
             
@@ -708,6 +1141,130 @@ class ComfyUIVideoGenerator:
         except Exception as e:
             logger.error(f"❌ Erreur génération vidéo: {e}")
             return None
+        finally:
+            # Entrées propres à ce prompt : libérées quelle que soit l'issue
+            self._ws_outputs.pop(prompt_id, None)
+            if video_path:
+                self._video_sizes.pop(video_path, None)
+
+    @staticmethod
+    def _copy_file(source: str, destination: Path) -> int:
+        """Copie un fichier (contenu + métadonnées, comme shutil.copy2) et retourne le nombre d'octets écrits"""
+        total = 0
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            while chunk := src.read(1024 * 1024):
+                dst.write(chunk)
+                total += len(chunk)
+        shutil.copystat(source, destination)
+        return total
+
+    def generate_batch(self, signs: List[str], format_name: str = "test") -> Dict[str, Optional[ConstellationVideoResult]]:
+        """
+        Génère plusieurs vidéos en pipeline : tous les prompts sont mis en file d'emblée,
+        une seule WebSocket suit leur exécution, et chaque vidéo terminée est récupérée
+        pendant que le GPU traite les suivantes.
+        """
+        # Un signe en double finaliserait deux prompts vers le même fichier {sign}_{format}_{timestamp}.mp4
+        signs = list(dict.fromkeys(signs))
+        results: Dict[str, Optional[ConstellationVideoResult]] = {sign: None for sign in signs}
+        
+        if not self.test_connection():
+            logger.error("❌ Impossible de se connecter à ComfyUI")
+            return results
+        
+        ws = websocket.WebSocket()
+        # Un identifiant par lot : la WebSocket du lot ne reçoit que les événements de ses prompts
+        client_id = str(uuid.uuid4())
+        executor = ThreadPoolExecutor(max_workers=settings.COMFYUI_BATCH_WORKERS, thread_name_prefix="comfyui_collect")
+        pending: Dict[str, str] = {}  # prompt_id -> signe
+        timestamps: Dict[str, str] = {}  # signe -> horodatage de la génération
+        futures = {}
+        
+        try:
+            # Connexion avant la mise en file pour ne manquer aucun événement
+            ws.connect(self._get_ws_url(client_id))
+            messages = self._start_ws_reader(ws)
+            
+            # Producteur : tous les signes partent dans la file ComfyUI
+            for sign in signs:
+                job = self.submit_to_comfyui(sign, format_name, client_id=client_id)
+                if job is None:
+                    continue
+                prompt_id, timestamps[sign] = job
+                pending[prompt_id] = sign
+            
+            queued = len(pending)
+            
+            def finish(prompt_id: str, source: str = "") -> None:
+                sign = pending.pop(prompt_id)
+                logger.info(f"✅ Génération terminée pour {sign}{source} ({queued - len(pending)}/{queued})")
+                # Consommateur : finalisation locale pendant que le GPU enchaîne sur le prompt suivant.
+                # Pas de repli sur « le mp4 le plus récent » : avec plusieurs prompts, il pourrait appartenir à un autre signe
+                futures[sign] = executor.submit(self.finalize_video, sign, format_name, prompt_id, timestamps[sign],
+                                                None, queued == 1)
+            
+            def fail(prompt_id: str, reason: str) -> None:
+                sign = pending.pop(prompt_id)
+                self._ws_outputs.pop(prompt_id, None)
+                logger.error(f"❌ Génération échouée pour {sign}: {reason} ({queued - len(pending)}/{queued})")
+            
+            # Pas de délai global : les derniers prompts du lot attendent leur tour dans la file ComfyUI
+            while pending:
+                try:
+                    message = messages.get(timeout=self.ws_recv_timeout)
+                except queue.Empty:
+                    # Silence WebSocket : l'historique fait foi
+                    for prompt_id in list(pending):
+                        status = self._prompt_status(prompt_id)
+                        if status.get('status_str') == 'error':
+                            fail(prompt_id, "erreur signalée par l'historique")
+                        elif status.get('completed'):
+                            finish(prompt_id, " (via historique)")
+                    continue
+                if isinstance(message, Exception):
+                    raise message
+                
+                if ('"executing"' not in message and '"executed"' not in message
+                        and '"execution_error"' not in message and '"execution_interrupted"' not in message):
+                    continue
+                
+                data = _json_loads(message)
+                execution_data = data.get('data', {})
+                prompt_id = execution_data.get('prompt_id')
+                if prompt_id not in pending:
+                    continue
+                if data.get('type') == 'executed':
+                    self._record_executed(data)
+                elif data.get('type') == 'executing' and execution_data.get('node') is None:
+                    finish(prompt_id)
+                elif data.get('type') == 'execution_error':
+                    fail(prompt_id, f"nœud {execution_data.get('node_id')}: {execution_data.get('exception_message', 'erreur inconnue')}")
+                elif data.get('type') == 'execution_interrupted':
+                    fail(prompt_id, "exécution interrompue")
+        
+        except Exception as e:
+            logger.error(f"Erreur WebSocket (batch): {e}")
+        finally:
+            # Prompts abandonnés (erreur WebSocket) : aucune finalisation ne consommera leurs sorties
+            for prompt_id in pending:
+                self._ws_outputs.pop(prompt_id, None)
+            if ws.connected:
+                ws.close()
+            executor.shutdown(wait=True)
+        
+        for sign, future in futures.items():
+            results[sign] = future.result()
+        
+        return results
+
+    async def generate_constellation_video_async(self, sign: str, format_name: str = "test",
+                                                 custom_prompt: str = None, seed: int = None) -> Optional[ConstellationVideoResult]:
+        """Version asynchrone : la génération bloquante tourne dans un thread, la boucle d'événements reste libre"""
+        return await asyncio.to_thread(self.generate_constellation_video, sign, format_name, custom_prompt, seed)
+
+    async def generate_batch_async(self, signs: List[str], format_name: str = "test") -> Dict[str, Optional[ConstellationVideoResult]]:
+        """Version asynchrone de generate_batch (pipeline ComfyUI exécuté dans un thread)"""
+        return await asyncio.to_thread(self.generate_batch, signs, format_name)
 # =============================================================================
 # INITIALISATION ET OUTILS MCP
 # =============================================================================
@@ -716,10 +1273,10 @@ comfyui_generator = ComfyUIVideoGenerator()
 mcp = FastMCP("ComfyUI Video Generator")
 
 @mcp.tool()
-def get_comfyui_status() -> dict:
+async def get_comfyui_status() -> dict:
     """Vérifie l'état du générateur ComfyUI"""
     try:
-        connected = comfyui_generator.test_connection()
+        connected = await asyncio.to_thread(comfyui_generator.test_connection)
         
         return {
             "success": True,
@@ -727,8 +1284,8 @@ def get_comfyui_status() -> dict:
             "server": comfyui_generator.server_address,
             "output_dir": str(comfyui_generator.output_dir),
             "images_dir": str(comfyui_generator.images_dir),
-            "available_formats": list(comfyui_generator.video_formats.keys()),
-            "supported_signs": list(comfyui_generator.sign_metadata.keys()),
+            "available_formats": comfyui_generator._formats_tuple,
+            "supported_signs": comfyui_generator._signs_tuple,
             "workflow_ready": True
         }
     
@@ -739,35 +1296,31 @@ def get_comfyui_status() -> dict:
 def get_sign_correspondences() -> dict:
     """Retourne toutes les correspondances des signes"""
     try:
-        return {
-            "success": True,
-            "correspondences": comfyui_generator.sign_metadata,
-            "total_signs": len(comfyui_generator.sign_metadata)
-        }
+        return _copy_payload(comfyui_generator._correspondences_payload)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 @mcp.tool()
-def generate_constellation_video(sign: str, format_name: str = "test", 
+async def generate_constellation_video(sign: str, format_name: str = "test", 
                                custom_prompt: Optional[str] = None, 
                                seed: Optional[int] = 886110862547056) -> dict:
     """Génère une vidéo de constellation avec ControlNet"""
     try:
-        if sign not in comfyui_generator.sign_metadata:
+        if sign not in comfyui_generator._signs_frozen:
             return {
                 "success": False,
                 "error": f"Signe inconnu: {sign}",
-                "available_signs": list(comfyui_generator.sign_metadata.keys())
+                "available_signs": comfyui_generator._signs_tuple
             }
         
-        if format_name not in comfyui_generator.video_formats:
+        if format_name not in comfyui_generator._formats_frozen:
             return {
                 "success": False,
                 "error": f"Format inconnu: {format_name}",
-                "available_formats": list(comfyui_generator.video_formats.keys())
+                "available_formats": comfyui_generator._formats_tuple
             }
         
-        result = comfyui_generator.generate_constellation_video(
+        result = await comfyui_generator.generate_constellation_video_async(
             sign=sign,
             format_name=format_name,
             custom_prompt=custom_prompt,
@@ -777,7 +1330,7 @@ def generate_constellation_video(sign: str, format_name: str = "test",
         if result:
             return {
                 "success": True,
-                "result": asdict(result),
+                "result": result.to_dict(),
                 "message": f"Vidéo générée pour {result.sign_name}"
             }
         else:
@@ -791,31 +1344,29 @@ def generate_constellation_video(sign: str, format_name: str = "test",
         return {"success": False, "error": str(e)}
 
 @mcp.tool()
-def generate_batch_constellation_videos(format_name: str = "test", 
+async def generate_batch_constellation_videos(format_name: str = "test", 
                                       signs: Optional[List[str]] = None) -> dict:
     """Génère des vidéos pour plusieurs signes astrologiques"""
     try:
         if signs is None:
-            signs = list(comfyui_generator.sign_metadata.keys())
+            signs = comfyui_generator._signs_tuple
         
         results = []
         successful = 0
         failed = 0
         
+        logger.info(f"🎬 Génération batch de {len(signs)} signes")
+        batch_results = await comfyui_generator.generate_batch_async(signs, format_name)
+        
         for sign in signs:
-            logger.info(f"🎬 Génération {sign} ({successful + failed + 1}/{len(signs)})")
-            
-            result = comfyui_generator.generate_constellation_video(
-                sign=sign,
-                format_name=format_name
-            )
+            result = batch_results.get(sign)
             
             if result:
                 successful += 1
                 results.append({
                     "sign": sign,
                     "success": True,
-                    "result": asdict(result)
+                    "result": result.to_dict()
                 })
             else:
                 failed += 1
@@ -843,11 +1394,11 @@ def generate_batch_constellation_videos(format_name: str = "test",
 def preview_constellation_prompt(sign: str, custom_prompt: Optional[str] = None, seed: Optional[int] = 886110862547056) -> dict:
     """Prévisualise le prompt qui sera utilisé pour générer une constellation"""
     try:
-        if sign not in comfyui_generator.sign_metadata:
+        if sign not in comfyui_generator._signs_frozen:
             return {
                 "success": False,
                 "error": f"Signe inconnu: {sign}",
-                "available_signs": list(comfyui_generator.sign_metadata.keys())
+                "available_signs": comfyui_generator._signs_tuple
             }
         
         prompt = comfyui_generator.create_constellation_prompt(sign, custom_prompt)
@@ -860,7 +1411,7 @@ def preview_constellation_prompt(sign: str, custom_prompt: Optional[str] = None,
             "symbol": sign_data["symbol"],
             "seed": final_seed,
             "prompt": prompt,
-            "metadata": sign_data,
+            "metadata": dict(sign_data),
             "estimated_duration": "2-3 minutes",
             "image_reference": f"{sign}_image.jpg"
         }
@@ -870,22 +1421,24 @@ def preview_constellation_prompt(sign: str, custom_prompt: Optional[str] = None,
         return {"success": False, "error": str(e)}
 
 @mcp.tool()
-def check_reference_images() -> dict:
+async def check_reference_images() -> dict:
     """Vérifie la présence de toutes les images de référence"""
     try:
         missing_images = []
         existing_images = []
+        images = comfyui_generator.images_index()
         
         for sign in comfyui_generator.sign_metadata.keys():
             image_filename = f"{sign}_image.jpg"
             image_path = comfyui_generator.images_dir / image_filename
+            entry = images.get(image_filename)
             
-            if image_path.exists():
+            if entry is not None:
                 existing_images.append({
                     "sign": sign,
                     "filename": image_filename,
                     "path": str(image_path),
-                    "size": os.path.getsize(image_path)
+                    "size": entry.st_size
                 })
             else:
                 missing_images.append({
@@ -913,51 +1466,41 @@ def check_reference_images() -> dict:
 def get_video_formats() -> dict:
     """Retourne tous les formats vidéo disponibles"""
     try:
-        formats = {}
-        for name, specs in comfyui_generator.video_formats.items():
-            formats[name] = asdict(specs)
-        
-        return {
-            "success": True,
-            "formats": formats,
-            "count": len(formats)
-        }
+        return _copy_payload(comfyui_generator._formats_payload)
     
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 @mcp.tool()
-def generate_specific_signs_batch(signs_list: List[str], format_name: str = "test") -> dict:
+async def generate_specific_signs_batch(signs_list: List[str], format_name: str = "test") -> dict:
     """Génère des vidéos pour une liste spécifique de signes"""
     try:
         # Valider les signes
-        invalid_signs = [sign for sign in signs_list if sign not in comfyui_generator.sign_metadata]
+        invalid_signs = [sign for sign in signs_list if sign not in comfyui_generator._signs_frozen]
         if invalid_signs:
             return {
                 "success": False,
                 "error": f"Signes invalides: {', '.join(invalid_signs)}",
-                "available_signs": list(comfyui_generator.sign_metadata.keys())
+                "available_signs": comfyui_generator._signs_tuple
             }
         
         # Valider le format
-        if format_name not in comfyui_generator.video_formats:
+        if format_name not in comfyui_generator._formats_frozen:
             return {
                 "success": False,
                 "error": f"Format invalide: {format_name}",
-                "available_formats": list(comfyui_generator.video_formats.keys())
+                "available_formats": comfyui_generator._formats_tuple
             }
         
         results = []
         successful = 0
         failed = 0
         
-        for i, sign in enumerate(signs_list, 1):
-            logger.info(f"🎬 Génération {sign} ({i}/{len(signs_list)})")
-            
-            result = comfyui_generator.generate_constellation_video(
-                sign=sign,
-                format_name=format_name
-            )
+        logger.info(f"🎬 Génération batch de {len(signs_list)} signes")
+        batch_results = await comfyui_generator.generate_batch_async(signs_list, format_name)
+        
+        for sign in signs_list:
+            result = batch_results.get(sign)
             
             if result:
                 successful += 1
@@ -998,15 +1541,14 @@ if __name__ == "__main__":
         logger.info(f"🎬 ComfyUI connecté: {comfyui_generator.server_address}")
         logger.info(f"📁 Dossier de sortie: {comfyui_generator.output_dir}")
         logger.info(f"🖼️  Dossier images: {comfyui_generator.images_dir}")
-        logger.info(f"🎯 Formats disponibles: {list(comfyui_generator.video_formats.keys())}")
+        logger.info(f"🎯 Formats disponibles: {list(comfyui_generator._formats_tuple)}")
         logger.info(f"⭐ Signes supportés: {len(comfyui_generator.sign_metadata)} signes")
         
         # Vérifier les images de référence
-        missing_count = 0
-        for sign in comfyui_generator.sign_metadata.keys():
-            image_path = comfyui_generator.images_dir / f"{sign}_image.jpg"
-            if not image_path.exists():
-                missing_count += 1
+        images = comfyui_generator.images_index()
+        missing_count = sum(
+            1 for sign in comfyui_generator.sign_metadata if f"{sign}_image.jpg" not in images
+        )
         
         if missing_count == 0:
             logger.info("✅ Toutes les images de référence sont présentes")
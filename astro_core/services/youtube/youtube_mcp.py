@@ -33,6 +33,9 @@ FINAL_MONTAGE_DIR = settings.FINAL_MONTAGE_DIR
 INDIVIDUAL_DIR = settings.INDIVIDUAL_DIR
 CREDENTIALS_DIR = settings.YOUTUBE_CREDENTIALS_DIR
 
+# Taille des chunks d'upload (-1 = fichier envoyé en une seule requête)
+UPLOAD_CHUNKSIZE = -1
+
 # =============================================================================
 # PARTIE 1 : MOTEUR D'UPLOAD 
 # =============================================================================
@@ -168,14 +171,18 @@ Laissez notre intelligence artificielle AstroGenAI vous guider à travers les é
                 }
             }
 
-            media = MediaFileUpload(video_path, chunksize=-1, resumable=True)
+            media = MediaFileUpload(video_path, chunksize=UPLOAD_CHUNKSIZE, resumable=True)
             request = self.youtube_service.videos().insert(part=','.join(body.keys()), body=body, media_body=media)
 
-            response = None
-            while response is None:
-                status, response = request.next_chunk()
-                if status:
-                    print(f"Progression de l'upload : {int(status.progress() * 100)}%")
+            if UPLOAD_CHUNKSIZE == -1:
+                # Fichier envoyé en un seul bloc : pas de progression intermédiaire
+                response = request.execute()
+            else:
+                response = None
+                while response is None:
+                    status, response = request.next_chunk()
+                    if status:
+                        print(f"Progression de l'upload : {int(status.progress() * 100)}%")
 
             video_id = response['id']
             video_url = f"https://www.youtube.com/watch?v={video_id}"
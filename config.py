@@ -28,6 +28,8 @@ class Settings:
     # --- Configuration des Services Externes ---
     OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
     COMFYUI_SERVER = os.getenv("COMFYUI_SERVER", "127.0.0.1:8188")
+    # Vidéos ComfyUI finalisées en parallèle pendant qu'un batch continue sur le GPU
+    COMFYUI_BATCH_WORKERS = int(os.getenv("COMFYUI_BATCH_WORKERS", 2))
 
     # --- Configuration des Modèles IA ---
     # Modèle pour la génération de texte (horoscopes)
@@ -36,6 +38,12 @@ class Settings:
     OLLAMA_ORCHESTRATOR_MODEL = os.getenv("OLLAMA_ORCHESTRATOR_MODEL", "qwen3:14b")
     # Modèle pour le chat (conversationnel)
     OLLAMA_CHAT_MODEL = os.getenv("OLLAMA_CHAT_MODEL", "qwen3:14b")
+    # Requêtes simultanées acceptées par le serveur Ollama (cf. OLLAMA_NUM_PARALLEL côté serveur)
+    OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", 4))
+    # Horoscopes du jour en une seule requête groupée (désactivé : génération enrichie signe par signe)
+    HOROSCOPE_DAILY_BATCH = os.getenv("HOROSCOPE_DAILY_BATCH", "False").lower() in ("true", "1", "t")
+    # Fenêtre de regroupement des horoscopes demandés simultanément (avec HOROSCOPE_DAILY_BATCH), en ms
+    OLLAMA_BATCH_WINDOW_MS = int(os.getenv("OLLAMA_BATCH_WINDOW_MS", 10))
     OLLAMA_TIMEOUT = 10
     OLLAMA_CHAT_TIMEOUT = 60
 
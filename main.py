@@ -279,7 +279,7 @@ class AstroService:
         generate_audio = args.get("generate_audio", False)
         
         horoscope_result, audio_path, audio_duration = await astro_generator.generate_single_horoscope(
-            sign, date, generate_audio=generate_audio
+            sign, date, generate_audio=generate_audio, use_cache=not args.get("force", False)
         )
         
         result = {
@@ -885,7 +885,8 @@ async def api_generate_single_horoscope():
     arguments = {
         "sign": data['sign'],
         "date": data.get('date'),
-        "generate_audio": False
+        "generate_audio": False,
+        "force": bool(data.get('force', False))
     }
     
     result = await AstroService.call_astro_tool("generate_single_horoscope", arguments)
@@ -900,7 +901,8 @@ async def api_generate_single_horoscope_with_audio():
     arguments = {
         "sign": data['sign'],
         "date": data.get('date'),
-        "generate_audio": True
+        "generate_audio": True,
+        "force": bool(data.get('force', False))
     }
     
     result = await AstroService.call_astro_tool("generate_single_horoscope", arguments)
@@ -982,9 +984,10 @@ async def api_generate_chart_image():
     date_str = data.get('date')
 
     try:
-        # Import des dépendances nécessaires
-        from astro_core.services.astrochart.astrochart_mcp import astro_calculator
-        import datetime
+        # Calculateur partagé, déjà chargé avec le service Astro (pas de ré-import par requête)
+        astro_calculator = astro_generator.astro_calculator
+        if astro_calculator is None:
+            raise Exception("Calculateur AstroChart non disponible")
         
         # Validation et parsing de la date
         if date_str:
@@ -1168,7 +1171,7 @@ async def api_comfyui_generate_video():
         data.get('format', 'test')
     )
     
-    result = comfyui_generator.generate_constellation_video(
+    result = await comfyui_generator.generate_constellation_video_async(
         sign=sign,
         format_name=format_name,
         custom_prompt=data.get('custom_prompt'),
@@ -1210,12 +1213,12 @@ async def api_comfyui_generate_batch():
     successful = 0
     failed = 0
     
+    # Toutes les vidéos partent dans la file ComfyUI d'un coup, sans bloquer la boucle Quart
+    batch_results = await comfyui_generator.generate_batch_async(signs, format_name)
+    
     for sign in signs:
         try:
-            result = comfyui_generator.generate_constellation_video(
-                sign=sign,
-                format_name=format_name
-            )
+            result = batch_results.get(sign)
             
             if result:
                 successful += 1
@@ -1274,7 +1277,7 @@ async def api_comfyui_preview_prompt():
         "sign": sign_data["name"],
         "symbol": sign_data["symbol"],
         "prompt": prompt,
-        "metadata": sign_data,
+        "metadata": dict(sign_data),
         "estimated_duration": "2-3 minutes"
     })
 
@@ -1506,7 +1509,7 @@ async def _run_complete_sign_workflow(sign, date, format_name, add_music):
     if SERVICES['comfyui_generator']:
         print(f"🎬 Étape 2: Génération vidéo ComfyUI pour {sign}")
         validated_sign, validated_format = ComfyUIService.validate_sign_and_format(sign, format_name)
-        comfyui_result = comfyui_generator.generate_constellation_video(
+        comfyui_result = await comfyui_generator.generate_constellation_video_async(
             sign=validated_sign,
             format_name=validated_format
         )
@@ -2138,6 +2141,16 @@ def cli_show_settings():
 # POINT D'ENTRÉE PRINCIPAL
 # =============================================================================
 
+def shutdown_services():
+    """Libère les pools de connexions et de processus des services (à l'arrêt du serveur)"""
+    if astro_generator:
+        try:
+            asyncio.run(astro_generator.aclose())
+        except Exception as e:
+            print(f"⚠️  Arrêt du générateur astro: {e}")
+    if comfyui_generator:
+        comfyui_generator.close()
+
 def main():
     """Fonction principale de démarrage"""
     # Affichage startup
@@ -2169,6 +2182,10 @@ def main():
             print("  python app.py help    - Affiche cette aide")
             return
     
+    # Premier calcul astronomique payé avant d'accepter des requêtes
+    if astro_generator and astro_generator.astro_calculator:
+        astro_generator.astro_calculator.warm_up()
+    
     # Démarrage du serveur Flask
     try:
         app.run(
@@ -2182,6 +2199,8 @@ def main():
     except Exception as e:
         print(f"❌ Erreur fatale: {e}")
         sys.exit(1)
+    finally:
+        shutdown_services()
 
 if __name__ == '__main__':
     main()
@@ -161,13 +161,11 @@ def step1_generate_astrochart(services, date):
     astro_calculator = services['astrochart']
     
     chart_data = astro_calculator.generate_chart_data(date)
-    positions = astro_calculator.calculate_positions(date)
-    aspects = astro_calculator.calculate_aspects(positions)
     
     return {
         "chart_data": chart_data,
-        "positions": positions,
-        "aspects": aspects,
+        "positions": chart_data.planets,
+        "aspects": chart_data.aspects,
         "lunar_phase": chart_data.moon_phase
     }
 
@@ -310,7 +310,7 @@ async function generateIndividualHoroscope() {
         {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ sign, date })
+            body: JSON.stringify({ sign, date, force: true })
         },
         'individual-loading',
         'individual-result'
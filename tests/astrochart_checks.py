@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Vérifications des optimisations du calculateur astronomique
+- drapeau de rétrogradation (mouvement apparent sur deux jours, périodes connues)
+- positions vectorisées (un calcul groupé = les calculs jour par jour)
+- aspects par matrice NumPy (comparés à l'ancienne double boucle sur 3 000 cartes)
+Usage: python tests/astrochart_checks.py
+"""
+
+import datetime
+import random
+import sys
+import os
+
+# Ajouter le chemin pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from astro_core.services.astrochart.astrochart_mcp import (
+    AstralAspect, PlanetaryPosition, get_calculator
+)
+
+
+def reference_aspects(positions):
+    """Ancienne détection des aspects : double boucle sur les paires, premier aspect dans l'orbe"""
+    aspect_definitions = {
+        'conjunction': (0, 8),
+        'opposition': (180, 8),
+        'trine': (120, 6),
+        'square': (90, 6),
+        'sextile': (60, 4),
+    }
+    aspects = []
+    for i, planet1 in enumerate(positions):
+        for planet2 in positions[i+1:]:
+            angle_diff = abs(planet1.longitude - planet2.longitude)
+            if angle_diff > 180:
+                angle_diff = 360 - angle_diff
+            for aspect_name, (target_angle, orb) in aspect_definitions.items():
+                if abs(angle_diff - target_angle) <= orb:
+                    actual_orb = abs(angle_diff - target_angle)
+                    aspects.append(AstralAspect(
+                        planet1=planet1.name,
+                        planet2=planet2.name,
+                        aspect_type=aspect_name,
+                        orb=actual_orb,
+                        exact=(actual_orb <= 2.0)
+                    ))
+                    break
+    return aspects
+
+
+def _positions_from_longitudes(calculator, longitudes):
+    names = calculator._planet_names
+    return [
+        PlanetaryPosition(name=names[i], symbol="", longitude=longitude % 360.0,
+                          sign_index=0, sign_name="", degree_in_sign=0.0)
+        for i, longitude in enumerate(longitudes)
+    ]
+
+
+def check_aspects_against_reference(calculator, charts: int = 3000) -> bool:
+    """calculate_aspects donne les mêmes aspects que l'ancienne double boucle"""
+    print(f"\n📐 Aspects : comparaison sur {charts} cartes aléatoires et aux limites d'orbe...")
+    rng = random.Random(20240111)
+    planet_count = len(calculator._planet_names)
+    # Écarts placés exactement sur les bornes d'orbe, juste avant et juste après
+    boundaries = [target + sign * orb + nudge
+                  for target, orb in ((0, 8), (60, 4), (90, 6), (120, 6), (180, 8))
+                  for sign in (-1, 1) for nudge in (-1e-9, 0.0, 1e-9)]
+
+    mismatches = 0
+    for chart in range(charts):
+        if chart % 2:
+            longitudes = [rng.uniform(0, 360) for _ in range(planet_count)]
+        else:
+            base = rng.uniform(0, 360)
+            longitudes = [base + rng.choice(boundaries) * rng.choice((-1, 1)) for _ in range(planet_count)]
+        positions = _positions_from_longitudes(calculator, longitudes)
+        if calculator.calculate_aspects(positions) != reference_aspects(positions):
+            mismatches += 1
+
+    if mismatches:
+        print(f"   ❌ {mismatches} cartes différentes")
+        return False
+    print(f"   ✅ {charts} cartes identiques")
+    return True
+
+
+def check_batch_positions(calculator) -> bool:
+    """Un calcul groupé de 30 jours donne les positions des calculs jour par jour"""
+    print("\n🪐 Positions : calcul groupé contre calcul jour par jour...")
+    dates = [datetime.date(2024, 3, 1) + datetime.timedelta(days=i) for i in range(30)]
+    batch = calculator.calculate_positions_batch(dates)
+    for date, batch_positions in zip(dates, batch):
+        single = calculator.calculate_positions_batch([date])[0]
+        for a, b in zip(batch_positions, single):
+            if a.name != b.name or abs(a.longitude - b.longitude) > 1e-9 or a.retrograde != b.retrograde:
+                print(f"   ❌ {date} {a.name}: {a.longitude} / {b.longitude}")
+                return False
+    print(f"   ✅ {len(dates)} jours identiques")
+    return True
+
+
+def check_retrograde_flag(calculator) -> bool:
+    """Le drapeau de rétrogradation suit le mouvement apparent et les périodes connues"""
+    print("\n🔄 Rétrogradation...")
+    ok = True
+
+    # Périodes connues (milieu de période : loin des stations)
+    known = [
+        ("Mercure", datetime.date(2024, 4, 12), True),    # rétrograde du 1er au 25 avril 2024
+        ("Mercure", datetime.date(2024, 5, 15), False),
+        ("Mars", datetime.date(2025, 1, 15), True),       # rétrograde du 6 décembre 2024 au 23 février 2025
+        ("Mars", datetime.date(2024, 10, 1), False),
+        ("Jupiter", datetime.date(2024, 12, 1), True),    # rétrograde du 9 octobre 2024 au 4 février 2025
+        ("Jupiter", datetime.date(2024, 6, 1), False),
+    ]
+    for name, date, expected in known:
+        position = next(p for p in calculator.calculate_positions(date) if p.name == name)
+        passed = position.retrograde == expected
+        ok &= passed
+        print(f"   {'✅' if passed else '❌'} {name} le {date}: rétrograde={position.retrograde} (attendu {expected})")
+
+    # Cohérence sur une année : signe de l'écart de longitude entre la veille et le lendemain
+    dates = [datetime.date(2024, 1, 1) + datetime.timedelta(days=i) for i in range(-1, 367)]
+    longitudes = {d: {p.name: p.longitude for p in positions}
+                  for d, positions in zip(dates, calculator.calculate_positions_batch(dates))}
+    inconsistent = 0
+    for previous, current, following in zip(dates, dates[1:], dates[2:]):
+        for position in calculator.calculate_positions(current):
+            motion = (longitudes[following][position.name] - longitudes[previous][position.name] + 180.0) % 360.0 - 180.0
+            if position.retrograde != (motion < 0):
+                inconsistent += 1
+            if position.name in ("Soleil", "Lune") and position.retrograde:
+                inconsistent += 1
+    passed = inconsistent == 0
+    ok &= passed
+    print(f"   {'✅' if passed else '❌'} 2024 : drapeau cohérent avec le mouvement apparent ({inconsistent} écarts)")
+    return ok
+
+
+if __name__ == "__main__":
+    print("🌟" + "=" * 58)
+    print("🌟 VÉRIFICATIONS DU CALCULATEUR ASTRONOMIQUE")
+    print("🌟" + "=" * 58)
+
+    calculator = get_calculator()
+    results = [
+        check_aspects_against_reference(calculator),
+        check_batch_positions(calculator),
+        check_retrograde_flag(calculator),
+    ]
+    success = all(results)
+    print(f"\n{'🎉 Toutes les vérifications sont passées' if success else '❌ Des vérifications ont échoué'}")
+    sys.exit(0 if success else 1)
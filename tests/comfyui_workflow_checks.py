@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Vérifications du workflow ComfyUI préparé par gabarit
+- injection des valeurs par sentinelles (comparée à l'ancienne préparation par copie profonde)
+- recâblage du workflow quand la carte de contours Canny est en cache
+Usage: python tests/comfyui_workflow_checks.py
+"""
+
+import copy
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Ajouter le chemin pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from astro_core.services.comfyui_mcp import ComfyUIVideoGenerator
+
+TIMESTAMP = "20250321_120000"
+CUSTOM_PROMPTS = [
+    None,
+    'constellation "entre guillemets", barre \\ oblique, accents éèà et ✨',
+    'texte contenant une sentinelle "__SEED__" et __WIDTH__',
+]
+
+
+def reference_workflow(generator: ComfyUIVideoGenerator, sign: str, format_name: str,
+                       custom_prompt, seed: int) -> dict:
+    """Ancienne préparation : copie profonde du workflow de base puis affectation champ par champ"""
+    workflow = copy.deepcopy(generator.base_workflow)
+    specs = generator.video_formats.get(format_name, generator.video_formats["test"])
+
+    workflow["5"]["inputs"]["width"] = specs.width
+    workflow["5"]["inputs"]["height"] = specs.height
+    workflow["5"]["inputs"]["batch_size"] = specs.batch_size
+    workflow["6"]["inputs"]["seed"] = seed
+    workflow["22"]["inputs"]["frame_rate"] = specs.fps
+    workflow["22"]["inputs"]["filename_prefix"] = f"{sign}_{format_name}_{TIMESTAMP}"
+    workflow["27"]["inputs"]["image"] = f"{sign}_image.jpg"
+
+    workflow["6"]["inputs"]["steps"] = 25
+    workflow["6"]["inputs"]["cfg"] = 8.0
+    workflow["6"]["inputs"]["sampler_name"] = "dpmpp_2m"
+    workflow["6"]["inputs"]["scheduler"] = "karras"
+
+    workflow["18"]["inputs"]["prompts"] = generator.create_constellation_prompt(sign, custom_prompt)
+
+    workflow["26"]["inputs"]["strength"] = 0.2
+    workflow["26"]["inputs"]["start_percent"] = 0.0
+    if sign in ["gemini", "scorpio", "capricorn", "aquarius", "pisces"]:
+        workflow["26"]["inputs"]["end_percent"] = 0.5
+    else:
+        workflow["26"]["inputs"]["end_percent"] = 0.43
+
+    workflow["16"]["inputs"]["text"] = """blurry, low quality, human, duplicate, abrupt transition, sudden change, 
+        discontinuous animation, jerky movement, static image, frozen frame, harsh cuts, 
+        disconnected elements, scattered random dots, chaotic unconnected lines, 
+        unclear nebula formation, incomplete transformation, text, watermark, signature"""
+    return workflow
+
+
+def _references_node(workflow: dict, node_id: str) -> list:
+    """Nœuds dont une entrée pointe vers node_id"""
+    return [
+        source for source, node in workflow.items()
+        for value in node["inputs"].values()
+        if isinstance(value, list) and value and value[0] == node_id
+    ]
+
+
+def check_sentinel_splicing(generator: ComfyUIVideoGenerator) -> bool:
+    """Le workflow issu du gabarit est identique à l'ancienne préparation (hors nœud de sauvegarde Canny)"""
+    print("\n🧩 Gabarit à sentinelles contre préparation par copie profonde...")
+    compared = 0
+    for sign in generator.sign_metadata:
+        for format_name in generator.video_formats:
+            for custom_prompt in CUSTOM_PROMPTS:
+                seed = 886110862547056
+                workflow = generator.prepare_workflow(sign, format_name, custom_prompt, seed, TIMESTAMP)
+                save_node = workflow.pop(generator.CANNY_SAVE_NODE, None)
+                expected = reference_workflow(generator, sign, format_name, custom_prompt, seed)
+                if save_node is None or save_node["inputs"]["images"] != ["32", 0]:
+                    print(f"   ❌ {sign}/{format_name}: nœud de sauvegarde Canny absent ou mal câblé")
+                    return False
+                if workflow != expected:
+                    differing = [n for n in expected if workflow.get(n) != expected[n]]
+                    print(f"   ❌ {sign}/{format_name}: nœuds différents {differing}")
+                    return False
+                compared += 1
+    print(f"   ✅ {compared} workflows identiques")
+    return True
+
+
+def check_cached_edges_rewiring(generator: ComfyUIVideoGenerator) -> bool:
+    """Avec les contours en cache : Canny retiré, ControlNet branché sur l'image chargée, rien ne pointe vers 32"""
+    print("\n🗂️  Recâblage avec contours Canny en cache...")
+    sign = "leo"
+    canny_filename = generator._canny_filename(sign)
+    (generator.images_dir / canny_filename).write_bytes(b"png")
+    generator.refresh_images()
+
+    checks = []
+    workflow = generator.prepare_workflow(sign, "test", None, 1, TIMESTAMP)
+    checks.append(("cache détecté", generator.has_canny_edges(sign)))
+    checks.append(("nœud Canny 32 retiré", "32" not in workflow))
+    checks.append(("pas de nœud de sauvegarde 34", generator.CANNY_SAVE_NODE not in workflow))
+    checks.append(("ControlNet branché sur le chargeur d'image", workflow["26"]["inputs"]["image"] == ["27", 0]))
+    checks.append(("chargeur d'image sur la carte en cache", workflow["27"]["inputs"]["image"] == canny_filename))
+    checks.append(("aucune référence pendante vers 32", not _references_node(workflow, "32")))
+
+    expected = reference_workflow(generator, sign, "test", None, 1)
+    del expected["32"]
+    expected["26"]["inputs"]["image"] = ["27", 0]
+    expected["27"]["inputs"]["image"] = canny_filename
+    checks.append(("reste du workflow inchangé", workflow == expected))
+
+    # Image de référence remplacée : la carte en cache ne correspond plus
+    image_path = generator.images_dir / f"{sign}_image.jpg"
+    stat = image_path.stat()
+    os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    refreshed = generator.prepare_workflow(sign, "test", None, 1, TIMESTAMP)
+    checks.append(("image modifiée : contours recalculés", "32" in refreshed and generator.CANNY_SAVE_NODE in refreshed))
+
+    for label, passed in checks:
+        print(f"   {'✅' if passed else '❌'} {label}")
+    return all(passed for _, passed in checks)
+
+
+def check_serialized_payload(generator: ComfyUIVideoGenerator) -> bool:
+    """Le JSON envoyé à ComfyUI reste du JSON valide quel que soit le prompt personnalisé"""
+    print("\n📦 Sérialisation du workflow...")
+    for custom_prompt in CUSTOM_PROMPTS:
+        payload = generator.prepare_workflow_json("aries", "test", custom_prompt, 7, TIMESTAMP)
+        if json.loads(payload)["18"]["inputs"]["prompts"] != generator.create_constellation_prompt("aries", custom_prompt):
+            print(f"   ❌ Prompt altéré: {custom_prompt!r}")
+            return False
+    print(f"   ✅ {len(CUSTOM_PROMPTS)} prompts transmis sans altération")
+    return True
+
+
+if __name__ == "__main__":
+    print("🌟" + "=" * 58)
+    print("🌟 VÉRIFICATIONS DU WORKFLOW COMFYUI")
+    print("🌟" + "=" * 58)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        images_dir = Path(temp_dir) / "images"
+        images_dir.mkdir()
+        # Dossier d'images isolé : aucune carte Canny réelle ne fausse la comparaison
+        generator = ComfyUIVideoGenerator()
+        generator.images_dir = images_dir
+        for sign in generator.sign_metadata:
+            (images_dir / f"{sign}_image.jpg").write_bytes(b"jpg")
+        generator.refresh_images()
+
+        try:
+            results = [
+                check_sentinel_splicing(generator),
+                check_serialized_payload(generator),
+                check_cached_edges_rewiring(generator),
+            ]
+        finally:
+            generator.close()
+
+    success = all(results)
+    print(f"\n{'🎉 Toutes les vérifications sont passées' if success else '❌ Des vérifications ont échoué'}")
+    sys.exit(0 if success else 1)